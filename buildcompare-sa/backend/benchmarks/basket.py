@@ -0,0 +1,65 @@
+"""
+Basket optimizer benchmark: solve time against basket size for the exact (MILP)
+solver and the heuristic, plus how far the heuristic's cost lands above the optimum.
+"""
+import random
+from typing import Any, Dict, List, Sequence, Tuple
+
+from backend.benchmarks.harness import measure
+from backend.models import BasketLine, BasketOptimizeRequest, PriceItem, SupplierTerms
+from backend.services.basket_optimizer import BasketOptimizer
+
+SUPPLIERS = ["Builders Warehouse", "Cashbuild", "Leroy Merlin"]
+
+
+def make_basket(lines: int, suppliers: int = 3, seed: int = 1234) -> Tuple[List[BasketLine], List[SupplierTerms]]:
+    """A priced BoQ where each line has offers from a random subset of suppliers."""
+    rng = random.Random(seed)
+    names = SUPPLIERS[:suppliers] + [f"Hardware Store {j}" for j in range(suppliers - len(SUPPLIERS))]
+
+    basket = []
+    for i in range(lines):
+        base = rng.uniform(5, 800)
+        offers = [
+            PriceItem(
+                supplier=name,
+                product=f"{name} material {i}",
+                price=round(base * rng.uniform(0.85, 1.2), 2),
+                in_stock=rng.random() > 0.1,
+                stock_quantity=rng.randint(5, 80) if rng.random() < 0.3 else None,
+            )
+            for name in names if rng.random() < 0.8
+        ]
+        basket.append(BasketLine(name=f"Material {i}", quantity=rng.randint(1, 60), offers=offers))
+
+    terms = [
+        SupplierTerms(supplier=name, delivery_fee=round(rng.uniform(150, 650), 2), min_order=round(rng.uniform(0, 150) * lines, 2))
+        for name in names
+    ]
+    return basket, terms
+
+
+def run(
+    sizes: Sequence[int] = (10, 50, 100, 250, 500, 1000, 2000),
+    suppliers: Sequence[int] = (3, 12),
+    iterations: int = 5,
+    seed: int = 1234,
+) -> Dict[str, Any]:
+    optimizer = BasketOptimizer()
+    results: Dict[str, Any] = {}
+    for count in suppliers:
+        for lines in sizes:
+            basket, terms = make_basket(lines, suppliers=count, seed=seed + lines)
+            entry: Dict[str, Any] = {}
+            costs = {}
+            for solver in ("exact", "heuristic"):
+                request = BasketOptimizeRequest(lines=basket, suppliers=terms, solver=solver, time_budget_ms=10000)
+                response = optimizer.optimize(request)
+                costs[solver] = response.total_cost
+                entry[solver] = {
+                    **measure(lambda: optimizer.optimize(request), iterations=iterations, warmup=1),
+                    "optimal": response.optimal,
+                }
+            entry["heuristic_gap_pct"] = round((costs["heuristic"] - costs["exact"]) / costs["exact"] * 100, 4)
+            results[f"{count}_suppliers_{lines}_lines"] = entry
+    return results
@@ -0,0 +1,124 @@
+"""
+Export benchmark: rows/sec and peak RSS for exporting a priced BoQ as CSV and XLSX
+from the local SQLite project store, streamed (batched reads into the chunked writers,
+as the export endpoints do) versus materialized (every row and the whole file held in
+memory, as a JSON-style endpoint would build it).
+
+Each export runs in a fresh interpreter. Peak RSS is the kernel's high-water mark
+(VmHWM, reset through /proc/self/clear_refs once the interpreter is set up), and
+``rss_growth_kib`` is that peak minus the RSS just before the export started. Where
+/proc is unavailable, ``ru_maxrss`` is used instead (it can include the parent's peak).
+Streamed growth should stay flat as the row count grows; materialized growth scales
+with it.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, Sequence
+
+from backend.benchmarks.startup import REPO_ROOT
+from backend.models import ProjectMaterialIn
+from backend.services.project_store import SQLiteProjectStore
+
+USER = "bench-user"
+HEADER = ("Material", "Brand", "Category", "Quantity", "Unit", "Unit Price (ZAR)", "Line Total (ZAR)")
+
+_PROBE = (
+    "import json; from backend.benchmarks.exports import _export; "
+    "print(json.dumps(_export({path!r}, {project_id!r}, {export_format!r}, {streamed!r})))"
+)
+
+
+def _materials(count: int):
+    return [
+        ProjectMaterialIn(
+            name=f"Material {i} - {('Cement', 'Brick', 'Rebar', 'Timber')[i % 4]} grade {i % 13}",
+            brand=("PPC", "Corobrik", "AfriSam", None)[i % 4],
+            category=("cement", "bricks", "steel", "timber")[i % 4],
+            quantity=1 + i % 40,
+            unit=("bags", "units", "m", "m3")[i % 4],
+            estimated_price=round(5 + (i % 97) * 3.5, 2) if i % 20 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _memory_kib(field: str) -> int:
+    """VmRSS / VmHWM of this process in KiB, falling back to ru_maxrss."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+
+
+def _reset_peak_rss() -> None:
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")  # Resets VmHWM to the current RSS
+    except OSError:
+        pass
+
+
+def _export(path: str, project_id: str, export_format: str, streamed: bool) -> Dict[str, Any]:
+    """Run one export in this process and report its throughput and memory (called in a child interpreter)."""
+    import time
+
+    from backend.services.exports import stream_export
+
+    store = SQLiteProjectStore(path)
+    _reset_peak_rss()
+    before_kib = _memory_kib("VmRSS")
+    started = time.perf_counter()
+    if streamed:
+        chunks = stream_export(export_format, HEADER, store.iter_materials(project_id, USER))
+    else:
+        rows = list(store.iter_materials(project_id, USER))
+        chunks = [b"".join(stream_export(export_format, HEADER, rows))]
+
+    size = chunk_count = 0
+    for chunk in chunks:
+        size += len(chunk)
+        chunk_count += 1
+    elapsed = time.perf_counter() - started
+    peak_kib = _memory_kib("VmHWM")
+    return {"elapsed_s": elapsed, "file_bytes": size, "chunks": chunk_count, "peak_rss_kib": peak_kib, "rss_growth_kib": peak_kib - before_kib}
+
+
+def _run_child(path: str, project_id: str, export_format: str, streamed: bool) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(path=path, project_id=project_id, export_format=export_format, streamed=streamed)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(sizes: Sequence[int] = (10_000, 100_000), formats: Sequence[str] = ("csv", "xlsx")) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.sqlite3")
+        store = SQLiteProjectStore(path)
+        for size in sizes:
+            project_id = store.create_project(USER, f"Bench {size}")
+            store.save_boq(project_id, USER, _materials(size))
+            for export_format in formats:
+                for mode, streamed in (("streamed", True), ("materialized", False)):
+                    measured = _run_child(path, project_id, export_format, streamed)
+                    results.setdefault(f"{size}_rows", {}).setdefault(export_format, {})[mode] = {
+                        "rows_per_sec": round(size / measured["elapsed_s"], 2),
+                        "peak_rss_kib": measured["peak_rss_kib"],
+                        "rss_growth_kib": measured["rss_growth_kib"],
+                        "file_bytes": measured["file_bytes"],
+                        "chunks": measured["chunks"],
+                    }
+    return results
@@ -0,0 +1,129 @@
+"""
+Timing helpers and the JSON result format shared by every benchmark suite.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Metrics where a larger number is an improvement
+HIGHER_IS_BETTER = {"ops_per_sec", "throughput_rps", "pages_per_sec", "rows_per_sec"}
+# Metric name suffixes for latencies and sizes, where smaller is better
+LOWER_IS_BETTER_SUFFIXES = ("_ms", "_bytes", "_kib", "_kib_per_page")
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples_s: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds for a list of per-call durations in seconds."""
+    ordered = sorted(samples_s)
+    total = sum(ordered)
+    return {
+        "iterations": len(ordered),
+        "mean_ms": round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else 0.0,
+        "ops_per_sec": round(len(ordered) / total, 2) if total else 0.0,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 10) -> Dict[str, float]:
+    """Call ``fn`` repeatedly and summarize the per-call latency."""
+    for _ in range(warmup):
+        fn()
+
+    samples: List[float] = []
+    clock = time.perf_counter
+    for _ in range(iterations):
+        start = clock()
+        fn()
+        samples.append(clock() - start)
+    return summarize(samples)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap suite results with enough metadata to compare runs between commits."""
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "argv": sys.argv[1:],
+        },
+        "config": config,
+        "results": results,
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, inner, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float = 0.10,
+) -> List[Tuple[str, float, float, float]]:
+    """
+    Return ``(metric, baseline, current, change)`` for every tracked metric that got
+    worse by more than ``tolerance`` (a fraction, 0.10 = 10%).
+    Only latency, size and throughput figures are compared.
+    """
+    old: Dict[str, float] = {}
+    new: Dict[str, float] = {}
+    _flatten("", baseline.get("results", {}), old)
+    _flatten("", current.get("results", {}), new)
+
+    regressions = []
+    for metric, before in old.items():
+        name = metric.rsplit(".", 1)[-1]
+        if metric not in new or before <= 0:
+            continue
+        if not (name.endswith(LOWER_IS_BETTER_SUFFIXES) or name in HIGHER_IS_BETTER):
+            continue
+        after = new[metric]
+        change = (after - before) / before
+        worse = -change if name in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append((metric, before, after, round(change, 4)))
+    return regressions
@@ -0,0 +1,56 @@
+"""
+Price-history benchmark: ingest throughput, drop-detection latency per scrape batch
+and rollup query latency for a simulated catalogue scraped every hour.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from backend.benchmarks.harness import measure, summarize
+
+START = datetime(2025, 1, 1)
+
+
+def run(keys: int = 2000, days: int = 30, seed: int = 1234) -> Dict[str, Any]:
+    import numpy as np
+
+    from backend.services.price_history import PriceHistory, to_epoch
+
+    rng = np.random.default_rng(seed)
+    history = PriceHistory()
+    ids = np.array([history.key_id(f"Supplier {i % 5}", f"Product {i}") for i in range(keys)], dtype=np.int32)
+    base = rng.uniform(20, 2000, keys)
+    start = to_epoch(START)
+
+    samples: List[float] = []
+    events = 0
+    started = time.perf_counter()
+    for hour in range(days * 24):
+        # Mostly small noise, with an occasional sharp promotion
+        prices = base * (1 + rng.normal(0, 0.01, keys))
+        promo = rng.random(keys) < 0.002
+        prices[promo] *= 0.8
+        timestamps = np.full(keys, start + hour * 3600, dtype=np.int64)
+
+        batch_start = time.perf_counter()
+        events += len(history.ingest_arrays(ids, timestamps, prices))
+        samples.append(time.perf_counter() - batch_start)
+    elapsed = time.perf_counter() - started
+    rows = keys * days * 24
+
+    picker = random.Random(seed)
+    window = START + timedelta(days=days - 7)
+
+    def _query() -> None:
+        i = picker.randrange(keys)
+        history.rollups(f"Supplier {i % 5}", f"Product {i}", "daily")
+        history.rollups(f"Supplier {i % 5}", f"Product {i}", "hourly", since=window)
+
+    return {
+        "rows": rows,
+        "drop_events": events,
+        "ingest": {"rows_per_sec": round(rows / elapsed, 2), "batch": summarize(samples)},
+        "rollup_query": measure(_query, iterations=200),
+        "storage": history.stats(),
+    }
@@ -0,0 +1,144 @@
+"""
+HTTP load scenario: a deterministic mix of price, RAG, OCR and estimator traffic
+driven through httpx, either in-process against the ASGI app (offline, with stubs)
+or against a running server via ``base_url``.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.benchmarks.harness import summarize
+from backend.benchmarks.stubs import make_png, stubbed_services
+
+# Share of total traffic per endpoint
+DEFAULT_MIX: Dict[str, float] = {
+    "prices": 0.40,
+    "rag": 0.25,
+    "estimator": 0.20,
+    "ocr": 0.15,
+}
+
+PRICE_QUERIES = ["cement", "bricks", "sand", "paint", "roof tiles", "rebar", "plaster", "timber"]
+RAG_QUERIES = [
+    "What cement should I use for foundations?",
+    "How many bricks per square metre for a double wall?",
+    "What is the minimum ceiling height for habitable rooms?",
+    "Do roof trusses need to be tied down?",
+]
+ESTIMATOR_SPECS = [
+    {"foundation": "Strip footings", "structure": "Double skin brick", "roofing": "Concrete tiles", "finishing": "Plaster and paint"},
+    {"foundation": "Raft slab", "structure": "Maxi brick", "roofing": "IBR sheeting", "finishing": "Face brick"},
+]
+
+
+def build_schedule(total: int, mix: Dict[str, float], seed: int, users: int) -> List[Tuple[str, int, int]]:
+    """Pre-compute ``(endpoint, payload_index, user_index)`` so every run issues the same requests."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    return [
+        (rng.choices(names, weights)[0], rng.randrange(1 << 16), rng.randrange(users))
+        for _ in range(total)
+    ]
+
+
+async def _issue(client: httpx.AsyncClient, endpoint: str, index: int, token: str, png: bytes) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {token}"}
+    if endpoint == "prices":
+        query = PRICE_QUERIES[index % len(PRICE_QUERIES)]
+        return await client.get("/api/v1/prices/", params={"query": query}, headers=headers)
+    if endpoint == "rag":
+        body = {"query": RAG_QUERIES[index % len(RAG_QUERIES)], "n_context_results": 3}
+        return await client.post("/rag/query", json=body, headers=headers)
+    if endpoint == "estimator":
+        return await client.post("/api/v1/estimator/boq", json=ESTIMATOR_SPECS[index % len(ESTIMATOR_SPECS)], headers=headers)
+    if endpoint == "ocr":
+        files = {"file": ("boq.png", png, "image/png")}
+        return await client.post("/api/v1/ocr/upload", files=files, headers=headers)
+    raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    schedule: List[Tuple[str, int, int]],
+    concurrency: int,
+) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, int]], float]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    png = make_png(64)
+    cursor = iter(schedule)
+
+    async def worker() -> None:
+        clock = time.perf_counter
+        for endpoint, index, user in cursor:
+            start = clock()
+            try:
+                response = await _issue(client, endpoint, index, f"user-{user}", png)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[endpoint].append(clock() - start)
+            statuses[endpoint][status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def _report(
+    latencies: Dict[str, List[float]],
+    statuses: Dict[str, Dict[str, int]],
+    elapsed: float,
+) -> Dict[str, Any]:
+    everything = [sample for samples in latencies.values() for sample in samples]
+    errors = sum(
+        count for codes in statuses.values() for code, count in codes.items() if not code.startswith("2")
+    )
+    overall = summarize(everything)
+    overall["throughput_rps"] = round(len(everything) / elapsed, 2) if elapsed else 0.0
+    overall["errors"] = errors
+    overall["elapsed_s"] = round(elapsed, 3)
+    return {
+        "overall": overall,
+        "endpoints": {
+            name: {**summarize(samples), "status_codes": dict(statuses[name])}
+            for name, samples in sorted(latencies.items())
+        },
+    }
+
+
+def run(
+    total_requests: int = 2000,
+    concurrency: int = 32,
+    seed: int = 1234,
+    users: int = 16,
+    mix: Optional[Dict[str, float]] = None,
+    base_url: Optional[str] = None,
+    llm_latency_s: float = 0.0,
+    rate_limits: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run the mixed-traffic scenario and return throughput plus p50/p95/p99 per endpoint.
+    With ``rate_limits`` the in-process app enforces its token buckets and load
+    shedding, so the 429 counts per endpoint show how much traffic gets rejected.
+    """
+    schedule = build_schedule(total_requests, mix or DEFAULT_MIX, seed, users)
+
+    async def remote() -> Dict[str, Any]:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+            return _report(*await _drive(client, schedule, concurrency))
+
+    if base_url:
+        return asyncio.run(remote())
+
+    with stubbed_services(seed=seed, llm_latency_s=llm_latency_s, rate_limits=rate_limits) as stubs:
+        async def local() -> Dict[str, Any]:
+            transport = httpx.ASGITransport(app=stubs["app"], raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+                return _report(*await _drive(client, schedule, concurrency))
+
+        return asyncio.run(local())
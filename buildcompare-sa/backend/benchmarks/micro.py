@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks for the CPU-side hot paths: technical calculations, OCR decoding,
+context retrieval and the scraper cache.
+"""
+import asyncio
+from typing import Any, Dict
+
+from backend.benchmarks.harness import measure
+from backend.benchmarks.stubs import make_png, stubbed_services
+
+
+def bench_calculations(iterations: int) -> Dict[str, Any]:
+    from backend.calculations import (
+        calculate_bricks_needed,
+        calculate_paint_liters,
+        calculate_roof_tiles
+    )
+
+    return {
+        "bricks": measure(lambda: calculate_bricks_needed(86.5, "standard_double"), iterations),
+        "paint": measure(lambda: calculate_paint_liters(240.0, 3), iterations),
+        "roof": measure(lambda: calculate_roof_tiles(132.0), iterations),
+    }
+
+
+def bench_ocr(iterations: int) -> Dict[str, Any]:
+    from backend.services.ocr_service import ocr_service
+
+    small = make_png(64)
+    large = make_png(1024)
+    return {
+        "simulated_64px": measure(lambda: ocr_service.process_image(small), iterations),
+        "simulated_1024px": measure(lambda: ocr_service.process_image(large), max(1, iterations // 10)),
+        "invalid_bytes": measure(lambda: ocr_service.process_image(b"not-an-image"), iterations),
+    }
+
+
+def bench_retrieval(iterations: int) -> Dict[str, Any]:
+    from backend.services.groq_rag import groq_rag_service
+
+    query = "What cement should I use for foundations and bricklaying?"
+    return {
+        "retrieve_context": measure(lambda: groq_rag_service.retrieve_context(query, 3), iterations),
+        "rag_query": measure(lambda: groq_rag_service.query(query, 3), iterations),
+        "generate_boq": measure(lambda: groq_rag_service.generate_boq({"foundation": "strip"}), iterations),
+    }
+
+
+def bench_cache(iterations: int) -> Dict[str, Any]:
+    from backend.services.scraper import scraper_service
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(scraper_service.get_prices("cement"))
+
+        def miss() -> None:
+            scraper_service.cache.clear()
+            loop.run_until_complete(scraper_service.get_prices("cement"))
+
+        return {
+            "price_cache_hit": measure(lambda: loop.run_until_complete(scraper_service.get_prices("cement")), iterations),
+            "price_cache_miss": measure(miss, iterations),
+        }
+    finally:
+        loop.close()
+
+
+SUITES = {
+    "calculations": bench_calculations,
+    "ocr": bench_ocr,
+    "retrieval": bench_retrieval,
+    "cache": bench_cache,
+}
+
+
+def run(iterations: int = 2000, seed: int = 1234) -> Dict[str, Any]:
+    """Run every micro suite against the offline stubs."""
+    results: Dict[str, Any] = {}
+    with stubbed_services(seed=seed):
+        for name, suite in SUITES.items():
+            results[name] = suite(iterations)
+    return results
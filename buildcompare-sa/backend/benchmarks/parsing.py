@@ -0,0 +1,83 @@
+"""
+Retailer parsing benchmark over the saved HTML fixtures in ``tests/fixtures/retailers``.
+
+Reports pages/sec for the lxml parsers (whole page and 4 KiB streamed chunks), a
+BeautifulSoup full-DOM baseline for comparison, and Python heap allocated per page
+(tracemalloc; libxml2's own buffers are not included).
+"""
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from backend.services.retailer_parsers import RetailerParser, get_parser
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "retailers")
+
+FIXTURES: Dict[str, str] = {
+    "Builders Warehouse": "builders_search.html",
+    "Cashbuild": "cashbuild_search.html",
+    "Leroy Merlin": "leroy_merlin_search.html",
+}
+
+
+def load_fixture(supplier: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, FIXTURES[supplier]), "rb") as handle:
+        return handle.read()
+
+
+def _bs4_baseline(parser: RetailerParser, html: bytes) -> int:
+    """Full-DOM BeautifulSoup parse finding the same tiles, for comparison only."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    count = 0
+    for tile in soup.find_all(class_=parser.tile_class):
+        price = tile.find(class_=parser.price_class)
+        if price is not None and price.get_text(strip=True):
+            count += 1
+    return count
+
+
+def _pages_per_sec(fn: Callable[[], Any], pages: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(pages):
+        fn()
+    return round(pages / (time.perf_counter() - started), 2)
+
+
+def _heap_per_page_kib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 2)
+
+
+def run(pages: int = 200) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for supplier in FIXTURES:
+        parser = get_parser(supplier)
+        html = load_fixture(supplier)
+        chunks = [html[i:i + 4096] for i in range(0, len(html), 4096)]
+
+        results[supplier] = {
+            "page_bytes": len(html),
+            "products": len(parser.parse(html)),
+            "lxml": {
+                "pages_per_sec": _pages_per_sec(lambda: parser.parse(html), pages),
+                "heap_peak_kib_per_page": _heap_per_page_kib(lambda: parser.parse(html)),
+            },
+            "lxml_streamed": {
+                "pages_per_sec": _pages_per_sec(lambda: parser.parse(iter(chunks)), pages),
+                "heap_peak_kib_per_page": _heap_per_page_kib(lambda: parser.parse(iter(chunks))),
+            },
+            "bs4_baseline": {
+                "pages_per_sec": _pages_per_sec(lambda: _bs4_baseline(parser, html), max(1, pages // 10)),
+                "heap_peak_kib_per_page": _heap_per_page_kib(lambda: _bs4_baseline(parser, html)),
+            },
+        }
+    return results
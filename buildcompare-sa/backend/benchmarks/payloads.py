@@ -0,0 +1,98 @@
+"""
+Payload benchmark for price lists and generated BoQs: serialization time (FastAPI's
+default encoder vs orjson) and bytes on the wire per request for identity, gzip,
+brotli and conditional (If-None-Match) polling.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+
+from backend.benchmarks.harness import measure
+from backend.benchmarks.stubs import STUB_BOQ, stubbed_services
+from backend.models import PriceItem
+from backend.responses import dump_models, dumps
+from backend.services.scraper import scraper_service
+
+SUPPLIERS = ["Builders Warehouse", "Cashbuild", "Leroy Merlin"]
+
+
+def make_price_items(count: int) -> List[PriceItem]:
+    scraped_at = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        PriceItem(
+            supplier=SUPPLIERS[i % 3],
+            product=f"Material {i // 3} - Standard Grade",
+            price=round(50 + (i * 7.31) % 900, 2),
+            in_stock=i % 7 != 0,
+            stock_quantity=(i * 13) % 400,
+            link=f"https://example.co.za/p/{i}",
+            scraped_at=scraped_at,
+        )
+        for i in range(count)
+    ]
+
+
+def make_boq(lines: int) -> Dict[str, Any]:
+    base = STUB_BOQ["materials"]
+    return {"materials": [{**base[i % len(base)], "name": f"{base[i % len(base)]['name']} #{i}"} for i in range(lines)]}
+
+
+def bench_serialization(iterations: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for count in (3, 100, 1000):
+        items = make_price_items(count)
+        rounds = max(5, iterations // max(1, count // 10))
+        results[f"prices_{count}"] = {
+            "fastapi_default": measure(lambda: json.dumps(jsonable_encoder(items)).encode(), rounds, warmup=2),
+            "orjson": measure(lambda: dump_models(items), rounds, warmup=2),
+        }
+    boq = make_boq(2000)
+    results["boq_2000"] = {
+        "fastapi_default": measure(lambda: json.dumps(jsonable_encoder(boq)).encode(), 50, warmup=2),
+        "orjson": measure(lambda: dumps(boq), 50, warmup=2),
+    }
+    return results
+
+
+async def _wire_bytes(client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for label, encoding in (("identity", "identity"), ("gzip", "gzip"), ("br", "br")):
+        response = await client.request(method, url, headers={"Accept-Encoding": encoding}, **kwargs)
+        sizes[f"{label}_bytes"] = response.num_bytes_downloaded
+
+    first = await client.request(method, url, headers={"Accept-Encoding": "br, gzip"}, **kwargs)
+    revalidated = await client.request(
+        method, url, headers={"Accept-Encoding": "br, gzip", "If-None-Match": first.headers["etag"]}, **kwargs
+    )
+    sizes["not_modified_bytes"] = revalidated.num_bytes_downloaded
+    sizes["not_modified_status"] = revalidated.status_code
+    return sizes
+
+
+def bench_wire(seed: int) -> Dict[str, Any]:
+    with stubbed_services(seed=seed) as stubs:
+        stubs["groq"].boq_json = json.dumps(make_boq(500))
+
+        async def run() -> Dict[str, Any]:
+            transport = httpx.ASGITransport(app=stubs["app"])
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Seed the scraper cache with a large list so the price payload is realistic
+                scraper_service.cache["cement"] = (time.time(), make_price_items(300))
+                return {
+                    "prices_300": await _wire_bytes(client, "GET", "/api/v1/prices/", params={"query": "cement"}),
+                    "boq_500": await _wire_bytes(client, "POST", "/api/v1/estimator/boq", json={"foundation": "strip"}),
+                }
+
+        return asyncio.run(run())
+
+
+def run(iterations: int = 2000, seed: int = 1234) -> Dict[str, Any]:
+    return {
+        "serialization": bench_serialization(iterations),
+        "wire": bench_wire(seed),
+    }
@@ -0,0 +1,201 @@
+"""
+Project-store write benchmark on the local SQLite stand-in: rows/sec for saving a
+BoQ in one batched transaction versus inserting rows one by one, both inside a single
+transaction and with a commit per row (what the frontend's one-request-per-row does).
+
+SQLite runs in-process, so there is no network round trip per statement. Each
+strategy also reports how many statements it sent, and its rows/sec with a simulated
+``rtt_ms`` added per statement, which is closer to talking to a hosted Postgres.
+
+Given ``postgres_dsn``, the same comparison also runs against a real Postgres (streamed
+COPY versus one INSERT per row), in a throwaway schema that is dropped afterwards.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import closing, contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from backend.models import ProjectMaterialIn
+from backend.services.project_store import MATERIAL_COLUMNS, PostgresProjectStore, SQLiteProjectStore, _material_rows
+
+USER = "bench-user"
+POSTGRES_USER = "00000000-0000-4000-8000-00000000be4c"  # user_id is a UUID column on Postgres
+
+# The supabase/schema.sql project tables, without the auth.users reference and RLS policies
+POSTGRES_SCHEMA = """
+CREATE TABLE projects (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    name TEXT NOT NULL,
+    location TEXT,
+    total_budget NUMERIC(12, 2) DEFAULT 0.00,
+    spent NUMERIC(12, 2) DEFAULT 0.00,
+    status TEXT CHECK (status IN ('active', 'completed', 'on-hold')) DEFAULT 'active',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE TABLE project_materials (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    brand TEXT,
+    category TEXT,
+    quantity NUMERIC(10, 2) NOT NULL DEFAULT 1,
+    unit TEXT NOT NULL DEFAULT 'units',
+    estimated_price NUMERIC(10, 2),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE TABLE boq_history (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    file_name TEXT,
+    file_url TEXT,
+    extracted_data JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+
+class _CountingStore(SQLiteProjectStore):
+    """Counts the SQL statements sent, through SQLite's trace hook."""
+
+    statements = 0
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = super()._connect(check_same_thread=check_same_thread)
+        conn.set_trace_callback(self._count)
+        return conn
+
+    def _count(self, statement: str) -> None:
+        if not statement.startswith("PRAGMA"):
+            self.statements += 1
+
+
+def _materials(count: int):
+    return [
+        ProjectMaterialIn(name=f"Material {i}", category="other", quantity=1 + i % 40, unit="units", estimated_price=round(5 + (i % 97) * 3.5, 2))
+        for i in range(count)
+    ]
+
+
+def _per_row(store: SQLiteProjectStore, project_id: str, materials, commit_each: bool) -> None:
+    insert = f"INSERT INTO project_materials ({', '.join(MATERIAL_COLUMNS)}) VALUES ({', '.join('?' * len(MATERIAL_COLUMNS))})"
+    with closing(store._connect()) as conn:
+        if not commit_each:
+            conn.execute("BEGIN")
+        for row in _material_rows(project_id, materials):
+            if commit_each:
+                conn.execute("BEGIN")
+            conn.execute(insert, row)
+            conn.execute(
+                "UPDATE projects SET total_budget = total_budget + ? WHERE id = ?",
+                (round(row[4] * row[6], 2), project_id),
+            )
+            if commit_each:
+                conn.execute("COMMIT")
+        if not commit_each:
+            conn.execute("COMMIT")
+
+
+@contextmanager
+def scratch_postgres_store(dsn: str) -> Iterator[PostgresProjectStore]:
+    """A PostgresProjectStore on fresh project tables in a throwaway schema (also used by the tests)."""
+    import psycopg
+    from psycopg.conninfo import make_conninfo
+
+    schema = f"project_store_bench_{uuid.uuid4().hex[:12]}"
+    scoped = make_conninfo(dsn, options=f"-c search_path={schema}")
+    with psycopg.connect(dsn, autocommit=True) as admin:
+        admin.execute(f"CREATE SCHEMA {schema}")
+        try:
+            with psycopg.connect(scoped) as conn:
+                conn.execute(POSTGRES_SCHEMA)
+            yield PostgresProjectStore(scoped)
+        finally:
+            admin.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+def _postgres_per_row(store: PostgresProjectStore, project_id: str, materials, commit_each: bool) -> None:
+    insert = f"INSERT INTO project_materials ({', '.join(MATERIAL_COLUMNS)}) VALUES ({', '.join(['%s'] * len(MATERIAL_COLUMNS))})"
+    # Committing each row: autocommit plus a transaction per row; otherwise one transaction, committed on exit
+    with store.psycopg.connect(store.dsn, autocommit=commit_each) as conn:
+        for row in _material_rows(project_id, materials):
+            with conn.transaction() if commit_each else nullcontext():
+                conn.execute(insert, row)
+                conn.execute(
+                    "UPDATE projects SET total_budget = total_budget + %s WHERE id = %s",
+                    (round(row[4] * row[6], 2), project_id),
+                )
+
+
+def _rows_per_sec(fn: Callable[[], Any], rows: int, repeats: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return {"rows_per_sec": round(rows / best, 2)}
+
+
+def _run_postgres(dsn: str, sizes: Sequence[int], per_row_commit_cap: int, repeats: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with scratch_postgres_store(dsn) as store:
+        for size in sizes:
+            materials = _materials(size)
+            project_id = store.create_project(POSTGRES_USER, f"Bench {size}")
+            sampled = materials[:per_row_commit_cap]
+            results[f"{size}_rows"] = {
+                "copy": _rows_per_sec(lambda: store.save_boq(project_id, POSTGRES_USER, materials), size, repeats),
+                "per_row_single_txn": _rows_per_sec(lambda: _postgres_per_row(store, project_id, materials, False), size, repeats),
+                "per_row_commit": {
+                    **_rows_per_sec(lambda: _postgres_per_row(store, project_id, sampled, True), len(sampled), 1),
+                    "rows_sampled": len(sampled),
+                },
+            }
+    return results
+
+
+def _measure(store: _CountingStore, fn: Callable[[], Any], rows: int, rtt_ms: float, repeats: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeats):
+        store.statements = 0
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    statements = store.statements
+    return {
+        "rows_per_sec": round(rows / best, 2),
+        "statements": statements,
+        f"rows_per_sec_at_{rtt_ms:g}ms_rtt": round(rows / (best + statements * rtt_ms / 1000.0), 2),
+    }
+
+
+def run(
+    sizes: Sequence[int] = (100, 1000, 10000),
+    per_row_commit_cap: int = 2000,
+    rtt_ms: float = 2.0,
+    repeats: int = 3,
+    postgres_dsn: Optional[str] = None,
+) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        store = _CountingStore(os.path.join(directory, "bench.sqlite3"))
+        for size in sizes:
+            materials = _materials(size)
+            project_id = store.create_project(USER, f"Bench {size}")
+            # Commit-per-row is slow enough that large sizes are sampled
+            sampled = materials[:per_row_commit_cap]
+            results[f"{size}_rows"] = {
+                "batched": _measure(store, lambda: store.save_boq(project_id, USER, materials), size, rtt_ms, repeats),
+                "per_row_single_txn": _measure(store, lambda: _per_row(store, project_id, materials, False), size, rtt_ms, repeats),
+                "per_row_commit": {
+                    **_measure(store, lambda: _per_row(store, project_id, sampled, True), len(sampled), rtt_ms, 1),
+                    "rows_sampled": len(sampled),
+                },
+            }
+    if postgres_dsn:
+        results["postgres"] = _run_postgres(postgres_dsn, sizes, per_row_commit_cap, repeats)
+    return results
@@ -0,0 +1,92 @@
+"""
+Benchmark runner.
+
+Run from the repository root (the directory containing ``backend/``):
+
+    python -m backend.benchmarks.run startup micro load --output backend/benchmarks/results/latest.json
+    python -m backend.benchmarks.run load --compare backend/benchmarks/results/baseline.json
+
+Every suite runs against the deterministic stubs in ``stubs.py`` unless ``--base-url``
+points the load scenario at a live server.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.benchmarks import basket, exports, history, load, micro, parsing, payloads, projects, startup
+from backend.benchmarks.harness import build_report, compare_reports, write_report
+
+
+def _suites(args: argparse.Namespace) -> Dict[str, Callable[[], Any]]:
+    return {
+        "startup": lambda: startup.run(runs=args.startup_runs),
+        "micro": lambda: micro.run(iterations=args.iterations, seed=args.seed),
+        "parsing": lambda: parsing.run(pages=args.pages),
+        "payloads": lambda: payloads.run(iterations=args.iterations, seed=args.seed),
+        "projects": lambda: projects.run(postgres_dsn=args.postgres_dsn),
+        "exports": lambda: exports.run(),
+        "basket": lambda: basket.run(seed=args.seed),
+        "history": lambda: history.run(keys=args.history_keys, days=args.history_days, seed=args.seed),
+        "load": lambda: load.run(
+            total_requests=args.requests,
+            concurrency=args.concurrency,
+            seed=args.seed,
+            users=args.users,
+            base_url=args.base_url,
+            llm_latency_s=args.llm_latency_ms / 1000.0,
+            rate_limits=args.rate_limits,
+        ),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="BuildCompare backend benchmarks")
+    parser.add_argument("suites", nargs="*", default=["startup", "micro", "parsing", "payloads", "history", "basket", "projects", "exports", "load"], help="Suites to run (default: all)")
+    parser.add_argument("--output", default="backend/benchmarks/results/latest.json", help="Where to write the JSON report")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before a metric counts as a regression")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters for the import-time benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations per micro-benchmark")
+    parser.add_argument("--pages", type=int, default=200, help="Fixture pages parsed per retailer")
+    parser.add_argument("--history-keys", type=int, default=2000, help="Products tracked in the price-history benchmark")
+    parser.add_argument("--history-days", type=int, default=30, help="Days of hourly scrapes in the price-history benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests in the load scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=16, help="Distinct simulated users in the load scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Injected latency for the stub LLM")
+    parser.add_argument("--rate-limits", action="store_true", help="Enforce rate limiting and load shedding in the load scenario")
+    parser.add_argument("--postgres-dsn", help="Also benchmark the project store against this Postgres (COPY vs per-row INSERT)")
+    parser.add_argument("--base-url", help="Load-test a running server instead of the in-process app")
+    args = parser.parse_args(argv)
+
+    suites = _suites(args)
+    unknown = [name for name in args.suites if name not in suites]
+    if unknown:
+        parser.error(f"Unknown suite(s): {', '.join(unknown)}. Choose from: {', '.join(suites)}")
+
+    results: Dict[str, Any] = {}
+    for name in args.suites:
+        print(f"Running {name} benchmarks...")
+        results[name] = suites[name]()
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    report = build_report(results, config)
+    write_report(report, args.output)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = compare_reports(baseline, report, args.tolerance)
+        for metric, before, after, change in regressions:
+            print(f"REGRESSION {metric}: {before} -> {after} ({change:+.1%})")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
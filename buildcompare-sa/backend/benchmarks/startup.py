@@ -0,0 +1,72 @@
+"""
+Startup benchmark: import cost of ``backend.main`` measured with ``python -X importtime``
+in fresh interpreters, plus a check that no heavy dependency is pulled in at import time.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+# Modules that must only be loaded lazily (on first use or during lifespan warm-up)
+HEAVY_MODULES = ("chromadb", "sentence_transformers", "torch", "groq", "PIL", "pytesseract", "bs4", "psycopg")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_PROBE = (
+    "import sys, {module}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse ``-X importtime`` output into ``(module, self_us, cumulative_us)`` rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _import_once(module: str) -> Tuple[float, List[Tuple[str, int, int]], List[str]]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    last_line = (completed.stdout.strip().splitlines() or [""])[-1]
+    loaded = [name for name in last_line.split(",") if name]
+    return wall, parse_importtime(completed.stderr), loaded
+
+
+def run(runs: int = 5, module: str = "backend.main") -> Dict[str, Any]:
+    """Median import time of ``module`` across ``runs`` fresh interpreters."""
+    walls, totals = [], []
+    rows: List[Tuple[str, int, int]] = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        wall, rows, loaded = _import_once(module)
+        walls.append(wall * 1000)
+        totals.append(next((cumulative for name, _, cumulative in rows if name == module), 0) / 1000)
+
+    top = sorted(rows, key=lambda row: row[1], reverse=True)[:15]
+    return {
+        "module": module,
+        "runs": runs,
+        "import_ms": round(statistics.median(totals), 3),
+        "process_wall_ms": round(statistics.median(walls), 3),
+        "heavy_modules_loaded": loaded,
+        "top_self_time": [
+            {"module": name, "self_ms": round(self_us / 1000, 3), "cumulative_ms": round(cumulative_us / 1000, 3)}
+            for name, self_us, cumulative_us in top
+        ],
+    }
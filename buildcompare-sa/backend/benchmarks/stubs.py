@@ -0,0 +1,216 @@
+"""
+Deterministic, offline stand-ins for the external services the backend talks to.
+
+Groq, the retailer sites and Supabase Auth are all swapped for local fakes so that
+benchmarks (and tests) produce the same payloads on every run and never touch the
+network or the Groq quota.
+"""
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Union
+
+from fastapi import HTTPException, Security
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+# Small, fixed knowledge corpus mirroring the documents in seed_chroma.py
+STUB_DOCUMENTS: List[str] = [
+    "NHBRC requires 32.5N cement for bricklaying mortar and plastering.",
+    "For structural concrete (foundations, slabs), NHBRC recommends 42.5N cement to reach 25MPa strength.",
+    "A standard single garage is approximately 3m x 6m (18m2).",
+    "A standard double garage is approximately 6m x 6m (36m2).",
+    "Damp Proof Course (DPC) must be laid under all walls to prevent rising damp.",
+    "Roof trusses must be tied down with hoop iron straps embedded in the brickwork.",
+    "Window glazing in bathrooms must be obscure and safety glass (SANS 10400-N).",
+    "Minimum ceiling height for habitable rooms is 2.4 meters.",
+    "External walls usually require a double brick skin (220mm) or verified cavity wall.",
+    "Foundation trenches for single storey house are typically 600mm wide and 600mm deep.",
+    "A single skin wall uses approximately 55 imperial bricks per square metre including waste.",
+    "Concrete roof tiles need roughly 11.5 tiles per square metre of roof area.",
+    "Acrylic PVA covers about 9 square metres per litre per coat on smooth plaster.",
+    "Corobrik face bricks do not need plastering or painting on external walls.",
+    "Use Y10 reinforcing steel in strip footings for standard single storey houses.",
+]
+
+STUB_BOQ: Dict[str, Any] = {
+    "materials": [
+        {"name": "PPC Surebuild Cement 42.5N", "category": "cement", "quantity": 120, "unit": "bags", "brand": "PPC"},
+        {"name": "Imperial Clay Stock Bricks", "category": "bricks", "quantity": 14500, "unit": "units", "brand": "Corobrik"},
+        {"name": "Building Sand", "category": "other", "quantity": 18, "unit": "m3"},
+        {"name": "Y10 Reinforcing Steel 6m", "category": "steel", "quantity": 85, "unit": "units"},
+        {"name": "Concrete Roof Tiles", "category": "roofing", "quantity": 1380, "unit": "units", "brand": "Marley"},
+        {"name": "Acrylic PVA 20L", "category": "paint", "quantity": 14, "unit": "units", "brand": "Dulux"},
+    ]
+}
+
+_WORD_RE = re.compile(r"[a-z0-9.]+")
+
+
+def _tokens(text: str) -> set:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+class StubGroqClient:
+    """
+    Mimics the subset of the Groq SDK used by GroqRAGService:
+    ``client.chat.completions.create(...).choices[0].message.content``.
+
+    ``latency_s`` is a fixed delay or a function of the 1-based call number, and calls
+    listed in ``failures`` raise, so deadline and hedging paths can be driven exactly.
+    A call slower than its ``timeout`` raises TimeoutError once the timeout elapses.
+    """
+
+    def __init__(
+        self,
+        latency_s: Union[float, Callable[[int], float]] = 0.0,
+        boq: Optional[Dict[str, Any]] = None,
+        failures: Collection[int] = (),
+    ) -> None:
+        self.latency_s = latency_s
+        self.boq_json = json.dumps(boq or STUB_BOQ)
+        self.failures = set(failures)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages: List[Dict[str, str]], model: str, timeout: Optional[float] = None, **kwargs: Any) -> SimpleNamespace:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        latency = self.latency_s(call) if callable(self.latency_s) else self.latency_s
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Request timed out.")
+        if latency:
+            time.sleep(latency)
+        if call in self.failures:
+            raise RuntimeError("Stub LLM failure")
+
+        if kwargs.get("response_format", {}).get("type") == "json_object":
+            content = self.boq_json
+        else:
+            question = messages[-1]["content"].rsplit("User question:", 1)[-1].split("\n", 1)[0].strip()
+            content = f"Stub answer for: {question}"
+
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class StubCollection:
+    """Keyword-overlap stand-in for the ChromaDB collection (no embeddings, fully deterministic)."""
+
+    def __init__(self, documents: Optional[List[str]] = None) -> None:
+        self.documents = documents or STUB_DOCUMENTS
+        self._doc_tokens = [_tokens(doc) for doc in self.documents]
+
+    def query(self, query_texts: List[str], n_results: int = 3) -> Dict[str, List[List[str]]]:
+        documents = []
+        for text in query_texts:
+            terms = _tokens(text)
+            ranked = sorted(
+                range(len(self.documents)),
+                key=lambda i: (-len(terms & self._doc_tokens[i]), i)
+            )
+            documents.append([self.documents[i] for i in ranked[:n_results]])
+        return {"documents": documents}
+
+
+class StubSupabaseAuth:
+    """
+    Replacement for ``verify_token``: bearer tokens of the form ``user-<n>`` resolve to a
+    deterministic Supabase user, anything else is rejected like an expired session.
+    """
+
+    def users(self, count: int) -> List[str]:
+        return [f"user-{i}" for i in range(count)]
+
+    def __call__(self, credentials: HTTPAuthorizationCredentials = Security(HTTPBearer())) -> Dict[str, str]:
+        token = credentials.credentials
+        if not token.startswith("user-"):
+            raise HTTPException(status_code=401, detail="Invalid or expired session")
+        return {"id": f"00000000-0000-4000-8000-{int(token[5:]):012d}", "email": f"{token}@example.com"}
+
+    def optional(self, credentials: Optional[HTTPAuthorizationCredentials] = Security(HTTPBearer(auto_error=False))) -> Optional[Dict[str, str]]:
+        """Replacement for ``get_optional_user``: anonymous when no bearer token is sent."""
+        return None if credentials is None else self(credentials)
+
+
+def make_png(size: int = 64, seed: int = 0) -> bytes:
+    """Small deterministic PNG used as OCR input."""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (size, size), color=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    buffer = BytesIO()
+    image.save(buffer, "png")
+    return buffer.getvalue()
+
+
+@contextmanager
+def stubbed_services(seed: int = 1234, llm_latency_s: float = 0.0, rate_limits: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Swap the backend singletons onto the local stubs for the duration of the block.
+
+    The singletons are patched in place so every router that imported them by name
+    sees the stubs, and everything is restored on exit. Rate limiting is off unless
+    ``rate_limits`` is set, in which case it starts from empty in-memory buckets.
+    """
+    from backend.main import app
+    from backend.routers import estimator, prices
+    from backend.services import auth
+    from backend.services.groq_rag import groq_rag_service
+    from backend.services.ocr_service import ocr_service
+    from backend.services.rate_limiter import MemoryBucketStore, rate_limiter
+    from backend.services.scraper import scraper_service
+
+    ocr_service.warm_up()
+    saved = {
+        "groq_client": groq_rag_service.groq_client,
+        "collection": groq_rag_service.collection,
+        "rag_initialized": groq_rag_service._initialized,
+        "rng": scraper_service.rng,
+        "latency_scale": scraper_service.latency_scale,
+        "cache": scraper_service.cache,
+        "pytesseract": ocr_service.pytesseract,
+        "overrides": dict(app.dependency_overrides),
+        "limiter_store": rate_limiter.store,
+        "limiter_enabled": rate_limiter.enabled,
+    }
+
+    groq_client = StubGroqClient(latency_s=llm_latency_s)
+    supabase = StubSupabaseAuth()
+    groq_rag_service.groq_client = groq_client
+    groq_rag_service.collection = StubCollection()
+    groq_rag_service.reset_latency_stats()
+    scraper_service.rng = random.Random(seed)
+    scraper_service.latency_scale = 0.0
+    scraper_service.cache = {}
+    estimator._boq_cache.clear()
+    prices._encoded.clear()
+    ocr_service.pytesseract = None  # Force the deterministic simulated OCR path
+    app.dependency_overrides[auth.verify_token] = supabase
+    app.dependency_overrides[auth.get_optional_user] = supabase.optional
+    rate_limiter.store = MemoryBucketStore()
+    rate_limiter.enabled = rate_limits
+
+    try:
+        yield {"app": app, "groq": groq_client, "supabase": supabase}
+    finally:
+        groq_rag_service.groq_client = saved["groq_client"]
+        groq_rag_service.collection = saved["collection"]
+        groq_rag_service._initialized = saved["rag_initialized"]
+        groq_rag_service.reset_latency_stats()
+        scraper_service.rng = saved["rng"]
+        scraper_service.latency_scale = saved["latency_scale"]
+        scraper_service.cache = saved["cache"]
+        estimator._boq_cache.clear()
+        prices._encoded.clear()
+        ocr_service.pytesseract = saved["pytesseract"]
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(saved["overrides"])
+        rate_limiter.store = saved["limiter_store"]
+        rate_limiter.enabled = saved["limiter_enabled"]
@@ -0,0 +1,43 @@
+"""
+Shared FastAPI dependencies.
+"""
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import Depends, HTTPException, Request
+
+from backend.services.auth import get_optional_user
+from backend.services.rate_limiter import RateLimitExceeded, rate_limiter
+
+
+def client_identity(request: Request, user: Optional[dict] = Depends(get_optional_user)) -> str:
+    """Rate-limit key: the Supabase user id when authenticated, else the client IP."""
+    if user and user.get("id"):
+        return f"user:{user['id']}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limited(endpoint: str) -> Callable[..., AsyncIterator[None]]:
+    """
+    Dependency for expensive routes: sheds load when this worker is saturated, then
+    charges the caller's token bucket the endpoint's cost. Rejections are 429 with Retry-After.
+    """
+
+    async def dependency(identity: str = Depends(client_identity)) -> AsyncIterator[None]:
+        if not rate_limiter.enabled:
+            yield
+            return
+
+        try:
+            rate_limiter.admit()
+        except RateLimitExceeded as e:
+            raise HTTPException(status_code=429, detail=e.detail, headers={"Retry-After": e.retry_after_header})
+        try:
+            try:
+                await rate_limiter.check(identity, endpoint)
+            except RateLimitExceeded as e:
+                raise HTTPException(status_code=429, detail=e.detail, headers={"Retry-After": e.retry_after_header})
+            yield
+        finally:
+            rate_limiter.release()
+
+    return dependency
@@ -1,7 +1,8 @@
+import asyncio
 import os
-import uvicorn
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.models import (
@@ -16,16 +17,44 @@ from backend.calculations import (
     calculate_paint_liters,
     calculate_roof_tiles
 )
+from backend.dependencies import rate_limited
+from backend.middleware import CompressionMiddleware
 from backend.services.groq_rag import groq_rag_service
-from backend.routers import prices, ocr, estimator
+from backend.services.ocr_service import ocr_service
+from backend.routers import prices, ocr, estimator, projects, usage
 
 # Load environment variables
 load_dotenv()
 
+# Set WARM_UP_SERVICES=false to load the heavy clients on first request instead
+WARM_UP_SERVICES = os.getenv("WARM_UP_SERVICES", "true").lower() != "false"
+
+
+def warm_up_services() -> None:
+    """Load the RAG clients (Groq, ChromaDB, embeddings) and the OCR libraries."""
+    for service in (ocr_service, groq_rag_service):
+        try:
+            service.warm_up()
+        except Exception as e:
+            print(f"WARNING: Warm-up failed for {type(service).__name__}: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start serving immediately and warm the heavy singletons in a background thread.
+    Until warm-up finishes, /ready reports 503 while /health stays 200.
+    """
+    if WARM_UP_SERVICES:
+        app.state.warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up_services))
+    yield
+
+
 app = FastAPI(
     title="BuildCompare AI Backend",
     description="High-concurrency FastAPI server for BuildCompare SA with Groq RAG",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend integration
@@ -35,12 +64,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# gzip/brotli for JSON and text payloads above 1 KiB (price lists, BoQs)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(prices.router)
 app.include_router(ocr.router)
 app.include_router(estimator.router)
+app.include_router(projects.router)
+app.include_router(usage.router)
 
 
 # --- Routes ---
@@ -61,18 +96,38 @@ def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/rag/query", response_model=RAGQueryResponse)
+@app.get("/ready")
+def readiness_check(response: Response):
+    """
+    Readiness probe: 503 until the RAG and OCR services have finished loading. With
+    WARM_UP_SERVICES=false nothing loads them ahead of time, so a service that is not
+    loaded yet is reported as "lazy" (it loads on its first request) and doesn't block readiness.
+    """
+    components = {
+        name: "ready" if service.is_ready else "warming" if WARM_UP_SERVICES else "lazy"
+        for name, service in (("rag", groq_rag_service), ("ocr", ocr_service))
+    }
+    ready = "warming" not in components.values()
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "warming", "components": components}
+
+
+@app.post("/rag/query", response_model=RAGQueryResponse, dependencies=[Depends(rate_limited("rag"))])
 def query_knowledge_base(request: RAGQueryRequest):
     """
     RAG Endpoint using Groq Cloud:
     1. Search ChromaDB for relevant context.
     2. Pass context + query to Groq Llama 3.1.
     3. Return synthesized answer.
+    If the LLM misses the request's deadline_ms, the answer is extracted from the
+    retrieved context instead (answered_by="extractive").
     """
     try:
         result = groq_rag_service.query(
             user_query=request.query,
-            n_context_results=request.n_context_results
+            n_context_results=request.n_context_results,
+            deadline_s=request.deadline_ms / 1000 if request.deadline_ms else None
         )
         return RAGQueryResponse(**result)
     except Exception as e:
@@ -106,4 +161,6 @@ def technical_calculation(request: CalculationRequest):
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,183 @@
+"""
+ASGI middleware shared by the app.
+"""
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Try importing brotli, set to None if missing (gzip is then the only encoding)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+Message = dict
+Headers = List[Tuple[bytes, bytes]]
+
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"text/",
+    b"application/javascript",
+    b"application/xml",
+)
+
+
+def accepted_encodings(accept: bytes) -> Dict[str, float]:
+    """Content codings in an Accept-Encoding header with their q-values (q=0 means refused)."""
+    weights: Dict[str, float] = {}
+    for token in accept.decode("latin-1").lower().split(","):
+        coding, _, params = token.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+class _Encoder:
+    """Incremental gzip / brotli encoder with a common interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._gzip.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress text/JSON responses with brotli (preferred when installed and accepted)
+    or gzip, once the body reaches ``minimum_size`` bytes. Streaming responses are
+    compressed chunk by chunk so memory stays constant. Bodies that already carry a
+    Content-Encoding, or are not text-like (images, XLSX), pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def _negotiate(self, scope: dict) -> Optional[str]:
+        accept = b""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value
+                break
+        weights = accepted_encodings(accept)
+        # Highest q-value wins; on a tie brotli is preferred. "*" covers codings not listed
+        best, best_weight = None, 0.0
+        for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+            weight = weights.get(coding, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = coding, weight
+        return best
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Callable) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send_downstream = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    def _should_skip(self, headers: Headers) -> bool:
+        content_type = b""
+        for name, value in headers:
+            if name == b"content-encoding":
+                return True
+            if name == b"content-type":
+                content_type = value.lower()
+        return not content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _encoded_headers(self, length: Optional[int]) -> Headers:
+        headers = [
+            (name, value) for name, value in self.start["headers"]
+            if name not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in self.start["headers"] if name == b"vary"]
+        if not any(b"accept-encoding" in value.lower() for value in vary):
+            vary.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary)))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return headers
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = self._should_skip(message.get("headers", []))
+            if self.passthrough:
+                await self.send_downstream(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send_downstream(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        middleware = self.middleware
+
+        if self.encoder is None:
+            if not more_body:
+                # Whole body in one message: compress only if it is worth it
+                if len(body) < middleware.minimum_size:
+                    await self.send_downstream(self.start)
+                    await self.send_downstream(message)
+                    return
+                encoder = _Encoder(self.encoding, middleware.gzip_level, middleware.brotli_quality)
+                compressed = encoder.compress(body) + encoder.finish()
+                await self.send_downstream({**self.start, "headers": self._encoded_headers(len(compressed))})
+                await self.send_downstream({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming response: length unknown up front, compress incrementally
+            self.encoder = _Encoder(self.encoding, middleware.gzip_level, middleware.brotli_quality)
+            await self.send_downstream({**self.start, "headers": self._encoded_headers(None)})
+
+        chunk = self.encoder.compress(body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        if chunk or not more_body:
+            await self.send_downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,5 +1,5 @@
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Dict, Optional, List
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 
 
@@ -15,6 +15,30 @@ class PriceItem(BaseModel):
     scraped_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class PriceDropEvent(BaseModel):
+    """A newly scraped price that fell below the last known or rolling-median price."""
+    supplier: str
+    product: str
+    new_price: float
+    previous_price: Optional[float] = None
+    rolling_median: Optional[float] = None
+    drop_pct: float
+    basis: str  # "last_price", "rolling_median" or "both"
+    observed_at: datetime
+
+
+class PriceRollup(BaseModel):
+    """Min/median/max of one supplier/product over an hourly or daily bucket."""
+    supplier: str
+    product: str
+    granularity: str
+    bucket_start: datetime
+    min_price: float
+    median_price: float
+    max_price: float
+    count: int
+
+
 class PriceSearchResult(BaseModel):
     """Response model for price search endpoint."""
     query: str
@@ -42,6 +66,7 @@ class RAGQueryRequest(BaseModel):
     """Request model for RAG queries."""
     query: str = Field(..., min_length=3, max_length=500)
     n_context_results: int = Field(default=3, ge=1, le=10)
+    deadline_ms: Optional[int] = Field(default=None, ge=100, le=60000)  # Defaults to RAG_DEADLINE_MS
 
 
 class RAGQueryResponse(BaseModel):
@@ -50,6 +75,9 @@ class RAGQueryResponse(BaseModel):
     context_retrieved: List[str]
     llm_response: str
     model_used: str
+    answered_by: str = "llm"  # "llm", "llm_hedged" (a hedged retry won) or "extractive"
+    fallback_reason: Optional[str] = None  # "timeout", "error" or "not_configured" when extractive
+    latency_ms: Optional[float] = None
 
 
 class CalculationRequest(BaseModel):
@@ -72,3 +100,115 @@ class EstimatorRequest(BaseModel):
     structure: str = ""
     roofing: str = ""
     finishing: str = ""
+
+
+class BasketLine(BaseModel):
+    """One priced BoQ line: the quantity needed and the retailer offers found for it."""
+    name: str
+    quantity: float = Field(..., gt=0)
+    unit: str = "units"
+    offers: List[PriceItem] = Field(default_factory=list)
+
+
+class SupplierTerms(BaseModel):
+    """Delivery fee and minimum order value (ZAR, before delivery) for one supplier."""
+    supplier: str
+    delivery_fee: float = Field(default=0.0, ge=0)
+    min_order: float = Field(default=0.0, ge=0)
+
+
+class BasketOptimizeRequest(BaseModel):
+    """Request model for splitting a priced BoQ across suppliers."""
+    lines: List[BasketLine] = Field(..., min_length=1)
+    suppliers: List[SupplierTerms] = Field(default_factory=list)
+    solver: str = Field(default="auto", pattern="^(auto|exact|heuristic)$")
+    time_budget_ms: int = Field(default=500, ge=10, le=10000)
+
+
+class BasketAllocation(BaseModel):
+    """Quantity of one BoQ line bought from one supplier offer."""
+    line: int
+    name: str
+    supplier: str
+    product: str
+    quantity: float
+    unit_price: float
+    line_total: float
+    link: Optional[str] = None
+
+
+class SupplierOrder(BaseModel):
+    """Per-supplier order total within an optimized basket."""
+    supplier: str
+    subtotal: float
+    delivery_fee: float
+    total: float
+    lines: int
+
+
+class BasketOptimizeResponse(BaseModel):
+    """Response model for the basket optimizer."""
+    allocations: List[BasketAllocation]
+    orders: List[SupplierOrder]
+    unfulfilled: Dict[str, float]  # Line name -> quantity no in-stock offer could cover
+    total_cost: float
+    solver: str  # "exact" or "heuristic"
+    optimal: bool
+    solve_ms: float
+
+
+class PriceComparisonExportRequest(BaseModel):
+    """A priced BoQ to export as a supplier comparison (one row per line and offer)."""
+    lines: List[BasketLine] = Field(..., min_length=1)
+
+
+class EndpointUsage(BaseModel):
+    """Rate-limited calls by one caller to one endpoint."""
+    allowed: int = 0
+    rejected: int = 0
+    tokens: int = 0
+
+
+class UsageReport(BaseModel):
+    """Response model for the caller's rate-limit usage."""
+    identity: str
+    capacity: float
+    refill_per_sec: float
+    costs: Dict[str, float]
+    endpoints: Dict[str, EndpointUsage]
+
+
+class ProjectMaterialIn(BaseModel):
+    """One BoQ line to store in project_materials (estimator / OCR output plus an optional price)."""
+    name: str = Field(..., min_length=1)
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    quantity: float = Field(..., gt=0)
+    unit: str = "units"
+    estimated_price: Optional[float] = Field(default=None, ge=0)  # Unit price snapshot
+
+    @field_validator("quantity")
+    @classmethod
+    def _quantity_is_stored(cls, quantity: float) -> float:
+        # project_materials keeps 2 dp; a line that would be stored as 0.00 is rejected
+        if quantity < 0.005:
+            raise ValueError("quantity must be at least 0.01 once rounded to 2 decimal places")
+        return quantity
+
+
+class ProjectBoQSaveRequest(BaseModel):
+    """Request model for saving a whole BoQ into a project."""
+    materials: List[ProjectMaterialIn] = Field(..., min_length=1, max_length=50000)
+    file_name: Optional[str] = None
+    file_url: Optional[str] = None
+    replace: bool = False  # Replace the project's current materials instead of appending
+
+
+class ProjectBoQSaveResponse(BaseModel):
+    """Result of a BoQ save: rows written and the project's updated budget."""
+    project_id: str
+    boq_id: str
+    materials_saved: int
+    boq_total: float
+    total_budget: float
+    elapsed_ms: float
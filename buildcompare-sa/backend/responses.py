@@ -0,0 +1,86 @@
+"""
+Fast JSON serialization, conditional (ETag / If-None-Match) responses and streamed
+file exports.
+"""
+import hashlib
+from typing import Any, Iterable, Optional, Sequence
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Polling clients must revalidate every time, but can reuse their copy on a 304
+REVALIDATE = "no-cache"
+
+
+def dumps(payload: Any) -> bytes:
+    """orjson-encode a plain payload (dicts, lists, datetimes, Pydantic-free)."""
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dump_models(models: Iterable[BaseModel]) -> bytes:
+    """
+    Encode a list of flat Pydantic models (e.g. PriceItem) straight from their field
+    dicts. Several times faster than model_dump()/jsonable_encoder for large lists;
+    only valid for models whose fields orjson handles natively.
+    """
+    return orjson.dumps([vars(model) for model in models])
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag derived from the payload bytes (weak, as the body may be re-encoded in transit)."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    media_type: str = JSON_MEDIA_TYPE,
+    cache_control: str = REVALIDATE,
+) -> Response:
+    """Return 304 Not Modified when the client already holds ``body``, else the body with its ETag."""
+    etag = etag or content_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def export_response(
+    export_format: str,
+    filename: str,
+    header: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Sheet1",
+) -> StreamingResponse:
+    """
+    Stream ``rows`` as a CSV or XLSX attachment (``filename`` without extension).
+    Rows are pulled from the iterable as the client reads, so pass a generator to
+    keep memory flat.
+    """
+    from backend.services.exports import EXPORT_FORMATS, stream_export
+
+    return StreamingResponse(
+        stream_export(export_format, header, rows, sheet_name=sheet_name),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+            "Cache-Control": "no-store",
+        },
+    )
@@ -1,26 +1,76 @@
-from fastapi import APIRouter, HTTPException
-from backend.models import EstimatorRequest
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from backend.dependencies import rate_limited
+from backend.models import BasketLine, BasketOptimizeRequest, BasketOptimizeResponse, EstimatorRequest, PriceComparisonExportRequest
+from backend.responses import conditional_response, content_etag, dumps, export_response
+from backend.services.basket_optimizer import basket_optimizer
 from backend.services.groq_rag import groq_rag_service
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
 import json
+import time
 
 router = APIRouter(
     prefix="/api/v1/estimator",
     tags=["estimator"]
 )
 
-@router.post("/boq")
-async def generate_boq_estimate(request: EstimatorRequest):
+COMPARISON_EXPORT_HEADER = (
+    "Line", "Material", "Quantity", "Unit", "Supplier", "Product",
+    "Unit Price (ZAR)", "Line Total (ZAR)", "In Stock", "Cheapest", "Link",
+)
+
+# Generated BoQs keyed by a hash of the normalised specs: (stored_at, body, etag)
+BOQ_CACHE_TTL = 3600  # 1 hour
+BOQ_CACHE_MAX_ENTRIES = 512
+_boq_cache: Dict[str, Tuple[float, bytes, str]] = {}
+
+
+def _specs_key(specs: dict) -> str:
+    normalised = {field: " ".join(str(value).split()).lower() for field, value in specs.items()}
+    return hashlib.blake2b(dumps(dict(sorted(normalised.items()))), digest_size=16).hexdigest()
+
+
+def _cached_boq(key: str) -> Optional[Tuple[bytes, str]]:
+    entry = _boq_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, body, etag = entry
+    if time.time() - stored_at >= BOQ_CACHE_TTL:
+        del _boq_cache[key]
+        return None
+    return body, etag
+
+
+def _store_boq(key: str, body: bytes, etag: str) -> None:
+    _boq_cache.pop(key, None)
+    _boq_cache[key] = (time.time(), body, etag)
+    while len(_boq_cache) > BOQ_CACHE_MAX_ENTRIES:
+        del _boq_cache[next(iter(_boq_cache))]  # Oldest insertion first
+
+
+@router.post("/boq", dependencies=[Depends(rate_limited("estimator"))])
+async def generate_boq_estimate(request: EstimatorRequest, http_request: Request) -> Response:
     """
     Generate a Bill of Quantities using Groq Llama 3.1 based on project specs.
     Returns a structured JSON list of materials.
+    Identical specs are served from a content-hash cache with an ETag, so repeat
+    requests skip the LLM and If-None-Match polls get 304.
     """
     try:
         # Convert request model to dict for the service
         specs = request.dict()
-        
-        # Call the RAG service which now uses Llama 3.1 in JSON mode
-        json_string = groq_rag_service.generate_boq(specs)
-        
+        key = _specs_key(specs)
+
+        cached = _cached_boq(key)
+        if cached is not None:
+            body, etag = cached
+            return conditional_response(http_request, body, etag)
+
+        # Call the RAG service which now uses Llama 3.1 in JSON mode. Off the event loop:
+        # the Groq call blocks, and so does waiting for a warm-up still in progress
+        json_string = await asyncio.to_thread(groq_rag_service.generate_boq, specs)
+
         # Parse the JSON string returned by the LLM
         try:
             result = json.loads(json_string)
@@ -29,8 +79,62 @@ async def generate_boq_estimate(request: EstimatorRequest):
             # We construct a simple error response or try to extract JSON from text
             print(f"Failed to parse LLM JSON: {json_string}")
             return {"materials": []} # Fail safe
-            
-        return result
-        
+
+        body = dumps(result)
+        etag = content_etag(body)
+        # Only cache real estimates, not the empty fail-safe
+        if isinstance(result, dict) and result.get("materials"):
+            _store_boq(key, body, etag)
+        return conditional_response(http_request, body, etag)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Estimator failure: {str(e)}")
+
+
+@router.post("/optimize", response_model=BasketOptimizeResponse, dependencies=[Depends(rate_limited("optimize"))])
+async def optimize_basket(request: BasketOptimizeRequest):
+    """
+    Split a priced BoQ across suppliers at the lowest total cost (offers plus delivery
+    fees), respecting stock and minimum order sizes. Small baskets are solved exactly;
+    large ones use a heuristic bounded by time_budget_ms.
+    """
+    try:
+        # CPU-bound: keep the event loop free while the solver runs
+        return await asyncio.to_thread(basket_optimizer.optimize, request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _comparison_rows(lines: List[BasketLine]) -> Iterator[Tuple[Any, ...]]:
+    """One row per BoQ line and offer, cheapest offer first; lines without offers get one empty row."""
+    for number, line in enumerate(lines, start=1):
+        if not line.offers:
+            yield (number, line.name, line.quantity, line.unit, None, None, None, None, None, None, None)
+            continue
+        offers = sorted(line.offers, key=lambda offer: offer.price)
+        cheapest = min((offer.price for offer in offers if offer.in_stock), default=None)
+        for offer in offers:
+            yield (
+                number, line.name, line.quantity, line.unit, offer.supplier, offer.product,
+                offer.price, round(offer.price * line.quantity, 2), offer.in_stock,
+                offer.price == cheapest and offer.in_stock, offer.link,
+            )
+
+
+@router.post("/export")
+async def export_price_comparison(
+    request: PriceComparisonExportRequest,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$")
+):
+    """
+    Download a priced BoQ as a supplier comparison sheet (CSV or XLSX) for quoting:
+    every offer per line with its line total, flagging the cheapest in-stock one.
+    The file is streamed as it is written.
+    """
+    return export_response(
+        export_format,
+        "price-comparison",
+        COMPARISON_EXPORT_HEADER,
+        _comparison_rows(request.lines),
+        sheet_name="Price comparison",
+    )
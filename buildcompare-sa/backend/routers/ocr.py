@@ -1,12 +1,14 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from backend.dependencies import rate_limited
 from backend.services.ocr_service import ocr_service
+import asyncio
 
 router = APIRouter(
     prefix="/api/v1/ocr",
     tags=["ocr"]
 )
 
-@router.post("/upload")
+@router.post("/upload", dependencies=[Depends(rate_limited("ocr"))])
 async def upload_boq(file: UploadFile = File(...)):
     """
     Upload an image of a Bill of Quantities (handwritten or printed) for OCR processing.
@@ -16,7 +18,8 @@ async def upload_boq(file: UploadFile = File(...)):
     
     try:
         contents = await file.read()
-        extracted_text = ocr_service.process_image(contents)
+        # Tesseract (and a warm-up still in progress) would otherwise block the event loop
+        extracted_text = await asyncio.to_thread(ocr_service.process_image, contents)
         return {
             "filename": file.filename,
             "extracted_text": extracted_text,
@@ -1,20 +1,107 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from backend.models import PriceDropEvent, PriceItem, PriceRollup
+from backend.responses import conditional_response, content_etag, dump_models, export_response
 from backend.services.scraper import scraper_service
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import time
 
 router = APIRouter(
     prefix="/api/v1/prices",
     tags=["prices"]
 )
 
-@router.get("/", response_model=List[Dict[str, Any]])
-async def get_aggregated_prices(query: str = Query(..., min_length=2)):
+HISTORY_EXPORT_HEADER = ("Supplier", "Product", "Period Start (UTC)", "Min (ZAR)", "Median (ZAR)", "Max (ZAR)", "Observations")
+
+# Encoded body + ETag per query, reused while the scraper serves the same cached list:
+# (stored_at, results, body, etag). Entries expire with the scraper's cache and the
+# oldest are evicted past the cap, so replaced lists are not kept alive.
+PRICE_BODY_CACHE_MAX_ENTRIES = 512
+_encoded: Dict[str, Tuple[float, List[PriceItem], bytes, str]] = {}
+
+
+def _cached_body(query: str, results: List[PriceItem]) -> Optional[Tuple[bytes, str]]:
+    entry = _encoded.get(query)
+    if entry is None:
+        return None
+    stored_at, cached_results, body, etag = entry
+    if cached_results is not results or time.time() - stored_at >= scraper_service.cache_ttl:
+        del _encoded[query]
+        return None
+    return body, etag
+
+
+def _store_body(query: str, results: List[PriceItem], body: bytes, etag: str) -> None:
+    _encoded.pop(query, None)
+    _encoded[query] = (time.time(), results, body, etag)
+    while len(_encoded) > PRICE_BODY_CACHE_MAX_ENTRIES:
+        del _encoded[next(iter(_encoded))]  # Oldest insertion first
+
+
+@router.get("/", response_model=List[PriceItem])
+async def get_aggregated_prices(request: Request, query: str = Query(..., min_length=2)) -> Response:
     """
     Fetch and aggregate prices from multiple retailers (Builders, Cashbuild, Leroy Merlin).
     Prioritizes AsyncIO for concurrency.
+    Responds with an ETag; clients polling with If-None-Match get 304 while prices are unchanged.
     """
     if not query:
         raise HTTPException(status_code=400, detail="Query string is required")
     
     results = await scraper_service.get_prices(query)
-    return results
+
+    cached = _cached_body(query, results)
+    if cached is not None:
+        body, etag = cached
+    else:
+        body = dump_models(results)
+        etag = content_etag(body)
+        _store_body(query, results, body, etag)
+
+    return conditional_response(request, body, etag)
+
+
+@router.get("/drops", response_model=List[PriceDropEvent])
+async def get_price_drops(
+    since: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Recent price drops detected across scrapes, newest first.
+    A drop is a price at least PRICE_DROP_THRESHOLD_PCT below the last known
+    or the rolling-median price for that supplier/product.
+    """
+    from backend.services.price_history import price_history
+
+    return price_history.recent_events(since=since, limit=limit)
+
+
+@router.get("/history", response_model=List[PriceRollup])
+async def get_price_history(
+    supplier: str = Query(..., min_length=2),
+    product: str = Query(..., min_length=2),
+    granularity: str = Query("daily", pattern="^(hourly|daily)$"),
+    since: Optional[datetime] = None
+):
+    """Hourly or daily min/median/max price rollups for one supplier/product."""
+    from backend.services.price_history import price_history
+
+    return price_history.rollups(supplier, product, granularity=granularity, since=since)
+
+
+
+@router.get("/history/export")
+async def export_price_history(
+    granularity: str = Query("daily", pattern="^(hourly|daily)$"),
+    since: Optional[datetime] = None,
+    supplier: Optional[str] = None,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$")
+):
+    """
+    Download hourly or daily min/median/max rollups for every tracked product
+    (optionally one supplier's) as CSV or XLSX, streamed as the rows are produced.
+    """
+    from backend.services.price_history import price_history
+
+    rows = price_history.iter_rollups(granularity=granularity, since=since, supplier=supplier)
+    return export_response(export_format, f"price-history-{granularity}", HISTORY_EXPORT_HEADER, rows, sheet_name="Price history")
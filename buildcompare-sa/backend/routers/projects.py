@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.models import ProjectBoQSaveRequest, ProjectBoQSaveResponse
+from backend.responses import export_response
+from backend.services.auth import get_current_user
+from backend.services.project_store import ProjectNotFound, get_project_store
+import asyncio
+from uuid import UUID
+
+router = APIRouter(
+    prefix="/api/v1/projects",
+    tags=["projects"]
+)
+
+MATERIALS_EXPORT_HEADER = ("Material", "Brand", "Category", "Quantity", "Unit", "Unit Price (ZAR)", "Line Total (ZAR)")
+
+
+@router.post("/{project_id}/boq", response_model=ProjectBoQSaveResponse)
+async def save_project_boq(
+    project_id: UUID,
+    request: ProjectBoQSaveRequest,
+    user: dict = Depends(get_current_user),
+    store=Depends(get_project_store)
+):
+    """
+    Save an estimated or OCR'd BoQ into a project in one transaction: a boq_history
+    entry plus bulk-inserted project_materials rows, with total_budget adjusted by the
+    BoQ's value (quantity x estimated_price). With replace=true the project's
+    existing materials are removed (and their value subtracted) first.
+    """
+    try:
+        return await asyncio.to_thread(
+            store.save_boq,
+            str(project_id),
+            user["id"],
+            request.materials,
+            file_name=request.file_name,
+            file_url=request.file_url,
+            replace=request.replace,
+        )
+    except ProjectNotFound:
+        raise HTTPException(status_code=404, detail="Project not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save BoQ: {str(e)}")
+
+
+@router.get("/{project_id}/materials/export")
+async def export_project_materials(
+    project_id: UUID,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    user: dict = Depends(get_current_user),
+    store=Depends(get_project_store)
+):
+    """
+    Download the project's priced BoQ as CSV or XLSX. Rows are read from the database
+    in batches while the file streams, so memory stays flat for any project size.
+    """
+    try:
+        rows = await asyncio.to_thread(store.iter_materials, str(project_id), user["id"])
+    except ProjectNotFound:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return export_response(export_format, f"project-{project_id}-boq", MATERIALS_EXPORT_HEADER, rows, sheet_name="BoQ")
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from backend.dependencies import client_identity
+from backend.models import UsageReport
+from backend.services.rate_limiter import rate_limiter
+
+router = APIRouter(
+    prefix="/api/v1/usage",
+    tags=["usage"]
+)
+
+
+@router.get("/", response_model=UsageReport)
+async def get_usage(identity: str = Depends(client_identity)):
+    """
+    Rate-limit counters for the calling user (or IP when anonymous): allowed and
+    rejected calls and tokens spent per endpoint, plus the bucket settings.
+    """
+    return UsageReport(
+        identity=identity,
+        capacity=rate_limiter.capacity,
+        refill_per_sec=rate_limiter.refill_per_sec,
+        costs=rate_limiter.costs,
+        endpoints=await rate_limiter.usage(identity),
+    )
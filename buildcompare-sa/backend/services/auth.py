@@ -1,6 +1,11 @@
+import base64
+import hashlib
 import httpx
+import json
 import os
 import logging
+import time
+from typing import Dict, Optional, Tuple
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
@@ -12,11 +17,58 @@ SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
 security = HTTPBearer()
+# Same scheme, but a missing header resolves to None instead of a 403
+optional_security = HTTPBearer(auto_error=False)
+
+# Verified tokens (by hash) -> (expires_at, Supabase user), so a caller's repeat requests
+# skip the /auth/v1/user round trip. Kept short: a revoked session is honoured this long.
+TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_MAX_ENTRIES = 10000
+_token_cache: Dict[str, Tuple[float, dict]] = {}
+
+
+def _token_key(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def _token_exp(token: str) -> Optional[float]:
+    """The JWT's `exp` claim (unverified; Supabase has already checked the signature), if readable."""
+    try:
+        payload = token.split(".")[1]
+        return float(json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"])
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _cached_user(token: str) -> Optional[dict]:
+    key = _token_key(token)
+    entry = _token_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if time.time() >= expires_at:
+        del _token_cache[key]
+        return None
+    return user
+
+
+def _store_user(token: str, user: dict) -> None:
+    expires_at = time.time() + TOKEN_CACHE_TTL
+    exp = _token_exp(token)
+    if exp is not None:
+        expires_at = min(expires_at, exp)  # Never outlive the session itself
+    key = _token_key(token)
+    _token_cache.pop(key, None)
+    _token_cache[key] = (expires_at, user)
+    while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+        del _token_cache[next(iter(_token_cache))]  # Oldest insertion first
+
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     """
     Verifies the Supabase JWT in the Authorization header.
-    Uses Supabase Auth API to validate the token and return user data.
+    Uses Supabase Auth API to validate the token and return user data; a verified token
+    is remembered for TOKEN_CACHE_TTL seconds (capped at its expiry).
     """
     token = credentials.credentials
     
@@ -27,6 +79,10 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
              return {"id": "dev-user", "email": "dev@example.com"}
         raise HTTPException(status_code=500, detail="Auth configuration missing")
 
+    user = _cached_user(token)
+    if user is not None:
+        return user
+
     try:
         # Verify token with Supabase Auth API
         async with httpx.AsyncClient() as client:
@@ -39,7 +95,9 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
             )
             
             if response.status_code == 200:
-                return response.json()
+                user = response.json()
+                _store_user(token, user)
+                return user
             else:
                 logging.error(f"Supabase auth failed: {response.text}")
                 raise HTTPException(status_code=401, detail="Invalid or expired session")
@@ -56,3 +114,13 @@ def get_current_user(token_data: dict = Security(verify_token)):
     Dependency to get the current authenticated user.
     """
     return token_data
+
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)):
+    """
+    The authenticated user when a bearer token is sent, otherwise None (anonymous caller).
+    An invalid token is still rejected with 401.
+    """
+    if credentials is None:
+        return None
+    return await verify_token(credentials)
@@ -0,0 +1,339 @@
+"""
+Basket optimizer: split a priced BoQ across suppliers at the lowest total cost.
+
+The cost of a basket is what the chosen offers charge plus one delivery fee per
+supplier actually used. Out-of-stock offers are skipped and ``stock_quantity`` caps
+how much one offer can supply, so a line may be split across suppliers. Every
+supplier that is used must reach its minimum order value. Lines with a whole-number
+quantity (bags, bricks, units) are bought in whole units; fractional lines (m3 of
+sand) may be split freely.
+
+Small baskets are solved exactly as a mixed-integer program (SciPy's HiGHS, one
+binary "use this supplier" variable each). Large baskets, or installs without
+SciPy, use a greedy fill plus local search over the set of open suppliers that
+stops at the request's time budget.
+"""
+import math
+import os
+import time
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from backend.models import (
+    BasketAllocation,
+    BasketOptimizeRequest,
+    BasketOptimizeResponse,
+    PriceItem,
+    SupplierOrder,
+)
+
+EPS = 1e-6
+INFEASIBLE = "No allocation covers the basket while meeting every supplier's minimum order"
+
+
+class _Offer(NamedTuple):
+    line: int
+    supplier: int
+    price: float
+    cap: float  # Most this offer can supply for its line
+    item: PriceItem
+    whole: bool  # Bought in whole units (the line quantity is a whole number)
+
+
+def _is_whole(quantity: float) -> bool:
+    return abs(quantity - round(quantity)) <= EPS
+
+
+class _Problem:
+    """A request flattened into indexed offers, shared by both solvers."""
+
+    def __init__(self, request: BasketOptimizeRequest) -> None:
+        terms = {entry.supplier: entry for entry in request.suppliers}
+        self.lines = request.lines
+        self.suppliers: List[str] = []
+        self.offers: List[_Offer] = []
+        self.line_offers: List[List[int]] = []  # Offer ids per line, cheapest first
+        self.supplier_offers: List[List[int]] = []
+        self.demand: List[float] = []  # Quantity per line that in-stock offers can cover
+        self.unfulfilled: Dict[str, float] = {}
+
+        index: Dict[str, int] = {}
+        for i, line in enumerate(request.lines):
+            usable = sorted(
+                (item for item in line.offers if item.in_stock and item.stock_quantity != 0),
+                key=lambda item: item.price,
+            )
+            ids: List[int] = []
+            available = 0.0
+            whole = _is_whole(line.quantity)
+            for item in usable:
+                j = index.get(item.supplier)
+                if j is None:
+                    j = index[item.supplier] = len(self.suppliers)
+                    self.suppliers.append(item.supplier)
+                    self.supplier_offers.append([])
+                cap = line.quantity if item.stock_quantity is None else min(float(item.stock_quantity), line.quantity)
+                if whole:
+                    cap = float(math.floor(cap + EPS))
+                ids.append(len(self.offers))
+                self.supplier_offers[j].append(len(self.offers))
+                self.offers.append(_Offer(i, j, item.price, cap, item, whole))
+                available += cap
+
+            demand = min(line.quantity, available)
+            if line.quantity - demand > EPS:
+                self.unfulfilled[line.name] = round(self.unfulfilled.get(line.name, 0.0) + line.quantity - demand, 6)
+            self.line_offers.append(ids)
+            self.demand.append(demand)
+
+        self.fee = [terms[name].delivery_fee if name in terms else 0.0 for name in self.suppliers]
+        self.min_order = [terms[name].min_order if name in terms else 0.0 for name in self.suppliers]
+
+    def cost(self, quantities: Dict[int, float]) -> float:
+        used = set()
+        total = 0.0
+        for oid, qty in quantities.items():
+            if qty > EPS:
+                offer = self.offers[oid]
+                total += offer.price * qty
+                used.add(offer.supplier)
+        return total + sum(self.fee[j] for j in used)
+
+    def to_response(self, quantities: Dict[int, float], solver: str, optimal: bool, solve_ms: float) -> BasketOptimizeResponse:
+        subtotal = [0.0] * len(self.suppliers)
+        count = [0] * len(self.suppliers)
+        allocations: List[BasketAllocation] = []
+
+        for oid in sorted(quantities):  # Offer ids follow line order
+            qty = quantities[oid]
+            if qty <= EPS:
+                continue
+            offer = self.offers[oid]
+            total = offer.price * qty
+            subtotal[offer.supplier] += total
+            count[offer.supplier] += 1
+            allocations.append(BasketAllocation(
+                line=offer.line,
+                name=self.lines[offer.line].name,
+                supplier=offer.item.supplier,
+                product=offer.item.product,
+                quantity=round(qty, 6),
+                unit_price=offer.price,
+                line_total=round(total, 2),
+                link=offer.item.link,
+            ))
+
+        orders = [
+            SupplierOrder(
+                supplier=name,
+                subtotal=round(subtotal[j], 2),
+                delivery_fee=self.fee[j],
+                total=round(subtotal[j] + self.fee[j], 2),
+                lines=count[j],
+            )
+            for j, name in enumerate(self.suppliers) if count[j]
+        ]
+        return BasketOptimizeResponse(
+            allocations=allocations,
+            orders=orders,
+            unfulfilled=self.unfulfilled,
+            total_cost=round(sum(order.total for order in orders), 2),
+            solver=solver,
+            optimal=optimal,
+            solve_ms=round(solve_ms, 3),
+        )
+
+
+class BasketOptimizer:
+    """
+    Lowest-cost allocation of a priced BoQ across suppliers.
+    Baskets up to ``exact_max_lines`` lines are solved exactly; larger ones use the heuristic.
+    """
+
+    def __init__(self, exact_max_lines: int = 200) -> None:
+        self.exact_max_lines = exact_max_lines
+
+    def optimize(self, request: BasketOptimizeRequest) -> BasketOptimizeResponse:
+        """Raises ValueError when no allocation meets the suppliers' minimum orders."""
+        started = time.perf_counter()
+        deadline = started + request.time_budget_ms / 1000.0
+        problem = _Problem(request)
+
+        solution = None
+        solver = "heuristic"
+        if request.solver == "exact" or (request.solver == "auto" and len(request.lines) <= self.exact_max_lines):
+            solution = self._solve_exact(problem, max(deadline - time.perf_counter(), 0.01))
+            solver = "exact"
+        if solution is None:
+            # SciPy missing or the time limit hit before a feasible solution was found
+            solution = self._solve_heuristic(problem, deadline)
+            solver = "heuristic"
+
+        quantities, optimal = solution
+        return problem.to_response(quantities, solver, optimal, (time.perf_counter() - started) * 1000)
+
+    # --- Exact (MILP) ---
+
+    def _solve_exact(self, problem: _Problem, time_limit_s: float) -> Optional[Tuple[Dict[int, float], bool]]:
+        """
+        minimise   sum(price * x) + sum(fee * y)
+        subject to sum(x over a line's offers) == demand
+                   x <= cap * y[supplier]                    (only buy from used suppliers)
+                   sum(price * x over a supplier) >= min_order * y
+        with 0 <= x <= cap, y binary, and x integral for whole-unit lines.
+        """
+        # Imported here so SciPy only loads when a basket is actually optimized
+        try:
+            import numpy as np
+            from scipy.optimize import Bounds, LinearConstraint, milp
+            from scipy.sparse import coo_matrix
+        except ImportError:
+            return None
+
+        n, k = len(problem.offers), len(problem.suppliers)
+        if n == 0:
+            return {}, True
+
+        price = np.array([offer.price for offer in problem.offers])
+        whole = np.array([offer.whole for offer in problem.offers], dtype=float)
+        cap = np.array([offer.cap for offer in problem.offers])
+        supplier = np.array([offer.supplier for offer in problem.offers])
+        line = np.array([offer.line for offer in problem.offers])
+        offer_ids = np.arange(n)
+        demand = np.array(problem.demand)
+
+        cover = coo_matrix((np.ones(n), (line, offer_ids)), shape=(len(problem.lines), n + k))
+        link = coo_matrix(
+            (np.concatenate([np.ones(n), -cap]), (np.concatenate([offer_ids, offer_ids]), np.concatenate([offer_ids, n + supplier]))),
+            shape=(n, n + k),
+        )
+        constraints = [LinearConstraint(cover, demand, demand), LinearConstraint(link, -np.inf, 0)]
+
+        binding = [j for j in range(k) if problem.min_order[j] > 0]
+        if binding:
+            row = {j: r for r, j in enumerate(binding)}
+            mask = np.isin(supplier, binding)
+            rows = np.concatenate([[row[j] for j in supplier[mask]], np.arange(len(binding))])
+            cols = np.concatenate([offer_ids[mask], n + np.array(binding)])
+            values = np.concatenate([price[mask], -np.array([problem.min_order[j] for j in binding])])
+            minimum = coo_matrix((values, (rows, cols)), shape=(len(binding), n + k))
+            constraints.append(LinearConstraint(minimum, 0, np.inf))
+
+        result = milp(
+            np.concatenate([price, np.array(problem.fee)]),
+            constraints=constraints,
+            integrality=np.concatenate([whole, np.ones(k)]),
+            bounds=Bounds(np.zeros(n + k), np.concatenate([cap, np.ones(k)])),
+            options={"time_limit": time_limit_s},
+        )
+        if result.x is None:
+            if result.status == 2:
+                raise ValueError(INFEASIBLE)
+            return None
+        quantities = {}
+        for oid, qty in enumerate(result.x[:n]):
+            if qty > EPS:
+                # HiGHS returns integral values only to within its tolerance
+                quantities[oid] = float(round(qty)) if problem.offers[oid].whole else float(qty)
+        return quantities, result.status == 0
+
+    # --- Heuristic ---
+
+    def _solve_heuristic(self, problem: _Problem, deadline: float) -> Tuple[Dict[int, float], bool]:
+        """
+        Local search over which suppliers are open, starting from all of them: each
+        step opens or closes the one supplier that lowers the cost most. A given set
+        is priced by filling every line from its cheapest open offers, then topping up
+        suppliers that fall short of their minimum order.
+        """
+        evaluated: Dict[FrozenSet[int], Tuple[float, Optional[Dict[int, float]]]] = {}
+
+        def evaluate(open_set: FrozenSet[int]) -> Tuple[float, Optional[Dict[int, float]]]:
+            if open_set not in evaluated:
+                quantities = self._fill(problem, open_set)
+                evaluated[open_set] = (problem.cost(quantities) if quantities is not None else float("inf"), quantities)
+            return evaluated[open_set]
+
+        everyone = frozenset(range(len(problem.suppliers)))
+        current = everyone
+        current_cost, best = evaluate(current)
+
+        while time.perf_counter() < deadline:
+            step = None
+            for j in everyone:
+                if time.perf_counter() >= deadline:
+                    break
+                candidate = current - {j} if j in current else current | {j}
+                cost, quantities = evaluate(candidate)
+                if cost < current_cost - EPS:
+                    step, current_cost, best = candidate, cost, quantities
+            if step is None:
+                break
+            current = step
+
+        if best is None:
+            raise ValueError(INFEASIBLE)
+        return best, False
+
+    def _fill(self, problem: _Problem, open_set: FrozenSet[int]) -> Optional[Dict[int, float]]:
+        quantities: Dict[int, float] = {}
+        subtotal = [0.0] * len(problem.suppliers)
+
+        for i, ids in enumerate(problem.line_offers):
+            remaining = problem.demand[i]
+            for oid in ids:
+                if remaining <= EPS:
+                    break
+                offer = problem.offers[oid]
+                if offer.supplier not in open_set:
+                    continue
+                take = min(remaining, offer.cap)
+                quantities[oid] = take
+                subtotal[offer.supplier] += take * offer.price
+                remaining -= take
+            if remaining > EPS:
+                return None
+
+        for j in open_set:
+            if subtotal[j] > EPS and subtotal[j] < problem.min_order[j] - EPS:
+                if not self._top_up(problem, quantities, subtotal, j):
+                    return None
+        return quantities
+
+    def _top_up(self, problem: _Problem, quantities: Dict[int, float], subtotal: List[float], j: int) -> bool:
+        """Shift quantity to supplier ``j`` from other suppliers, cheapest extra cost per rand first."""
+        moves = []
+        for oid in problem.supplier_offers[j]:
+            target = problem.offers[oid]
+            if target.cap - quantities.get(oid, 0.0) <= EPS:
+                continue
+            for other in problem.line_offers[target.line]:
+                source = problem.offers[other]
+                if source.supplier != j and quantities.get(other, 0.0) > EPS:
+                    moves.append(((target.price - source.price) / target.price, oid, other))
+        moves.sort()
+
+        deficit = problem.min_order[j] - subtotal[j]
+        for _, oid, other in moves:
+            if deficit <= EPS:
+                break
+            target, source = problem.offers[oid], problem.offers[other]
+            # Don't push the source supplier below its own minimum
+            held = quantities[other]
+            slack = (subtotal[source.supplier] - problem.min_order[source.supplier]) / source.price
+            needed = deficit / target.price
+            if target.whole:
+                # Whole units: round what's needed up, and the source's slack down
+                slack, needed = math.floor(slack + EPS), math.ceil(needed - EPS)
+            qty = min(held, max(slack, 0.0), target.cap - quantities.get(oid, 0.0), needed)
+            if qty <= EPS:
+                continue
+            quantities[other] = held - qty
+            quantities[oid] = quantities.get(oid, 0.0) + qty
+            subtotal[source.supplier] -= qty * source.price
+            subtotal[j] += qty * target.price
+            deficit -= qty * target.price
+        return deficit <= EPS
+
+
+# Singleton instance
+basket_optimizer = BasketOptimizer(exact_max_lines=int(os.getenv("BASKET_EXACT_MAX_LINES", "200")))
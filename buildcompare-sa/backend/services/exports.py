@@ -0,0 +1,189 @@
+"""
+Streaming CSV and XLSX writers for exports.
+
+Both take an iterable of row tuples and yield encoded chunks every ``flush_rows``
+rows, so memory stays flat however many rows are exported. XLSX is written
+directly as a streamed zip (one worksheet, inline strings instead of a shared-string
+table, which would have to be held in memory until the end).
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_FORMATS = {"csv": CSV_MEDIA_TYPE, "xlsx": XLSX_MEDIA_TYPE}
+
+FLUSH_ROWS = 1000
+
+# Text starting with these is run as a formula when the CSV is opened in a spreadsheet
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Control characters are not allowed in XML 1.0 text
+_XML_ILLEGAL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Names come from scrapers, OCR and user BoQs; keep Excel from evaluating them
+        return "'" + value
+    return value
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[Sequence[Any]], flush_rows: int = FLUSH_ROWS) -> Iterator[bytes]:
+    """UTF-8 CSV (with a BOM so Excel picks the encoding), yielded every ``flush_rows`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= flush_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value!r}</v></c>"
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    text = escape(_XML_ILLEGAL_RE.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number: int, values: Sequence[Any]) -> str:
+    return f'<row r="{number}">{"".join(_xlsx_cell(value) for value in values)}</row>'
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file that collects what zipfile writes until drained."""
+
+    def __init__(self) -> None:
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_xlsx(
+    header: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Sheet1",
+    flush_rows: int = FLUSH_ROWS,
+) -> Iterator[bytes]:
+    """Single-sheet XLSX workbook, yielded as zip chunks every ``flush_rows`` rows."""
+    sink = _ChunkSink()
+    # A non-seekable target makes zipfile write sizes in data descriptors after each entry
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(1, header).encode())
+
+            lines = []
+            for number, row in enumerate(rows, start=2):
+                lines.append(_xlsx_row(number, row))
+                if len(lines) >= flush_rows:
+                    sheet.write("".join(lines).encode())
+                    lines.clear()
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            sheet.write("".join(lines).encode())
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def stream_export(
+    export_format: str,
+    header: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Sheet1",
+) -> Iterator[bytes]:
+    if export_format == "csv":
+        return stream_csv(header, rows)
+    if export_format == "xlsx":
+        return stream_xlsx(header, rows, sheet_name=sheet_name)
+    raise ValueError(f"Unknown export format: {export_format}")
@@ -1,9 +1,14 @@
 import os
-from typing import List, Optional
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from groq import Groq
-import chromadb
-from chromadb.utils import embedding_functions
+
+if TYPE_CHECKING:
+    from groq import Groq
 
 # Load environment variables
 load_dotenv()
@@ -11,28 +16,101 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 CHROMA_PATH = "./chroma_db"
 
+# Latency budget for /rag/query (retrieval + LLM) when the request doesn't set one
+RAG_DEADLINE_MS = int(os.getenv("RAG_DEADLINE_MS", "8000"))
+# A hedged duplicate LLM request goes out once the first is slower than this percentile
+RAG_HEDGE_PERCENTILE = float(os.getenv("RAG_HEDGE_PERCENTILE", "95"))
+RAG_MAX_HEDGES = int(os.getenv("RAG_MAX_HEDGES", "1"))
+
+MIN_LATENCY_SAMPLES = 20  # Below this, hedge after default_hedge_after_s instead of the percentile
+
+SYSTEM_PROMPT = """You are an expert South African construction assistant for BuildCompare SA.
+You help contractors with material selection, quantity calculations, and advice based on SANS 10400 building regulations.
+Answer concisely and practically. Use ZAR for all prices. Reference SA-specific brands when possible."""
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def extractive_answer(query: str, context: List[str], max_sentences: int = 3) -> str:
+    """
+    Retrieval-only answer: the context sentences sharing the most words with the query,
+    kept in retrieval order. Used when the LLM misses its deadline or fails.
+    """
+    terms = set(_WORD_RE.findall(query.lower()))
+    scored = []
+    for doc_rank, doc in enumerate(context):
+        for position, sentence in enumerate(_SENTENCE_RE.split(doc.strip())):
+            overlap = len(terms & set(_WORD_RE.findall(sentence.lower())))
+            if sentence and overlap:
+                scored.append((-overlap, doc_rank, position, sentence))
+
+    if not scored:
+        if not context:
+            return "No answer is available right now and no matching knowledge-base entries were found. Please try again shortly."
+        scored = [(0, 0, 0, context[0].strip())]
+
+    best = sorted(sorted(scored)[:max_sentences], key=lambda entry: (entry[1], entry[2]))
+    return "From our knowledge base:\n" + "\n".join(f"- {entry[3]}" for entry in best)
+
 
 class GroqRAGService:
     """
     RAG Service using ChromaDB for context retrieval and Groq Cloud for LLM generation.
     Uses Llama 3.1 8B Instant model for fast responses.
+
+    The Groq SDK, ChromaDB and the sentence-transformers model are loaded lazily on
+    first use (or by warm_up() from the app lifespan), not at import time.
     """
     
     def __init__(self):
-        self.groq_client: Optional[Groq] = None
+        self.groq_client: Optional["Groq"] = None
         self.collection = None
         self.model_name = "llama-3.1-8b-instant"
-        self._initialize()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        # Deadline / hedging for query()
+        self.deadline_s = RAG_DEADLINE_MS / 1000.0
+        self.hedge_percentile = RAG_HEDGE_PERCENTILE
+        self.max_hedges = RAG_MAX_HEDGES
+        self.default_hedge_after_s = 2.0
+        self._llm_latencies: Deque[float] = deque(maxlen=256)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._initialized
+
+    def warm_up(self) -> None:
+        """Load the heavy clients now instead of on the first request."""
+        self._ensure_initialized()
+
+    def _ensure_initialized(self) -> None:
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize()
+                self._initialized = True
     
     def _initialize(self):
+        # Components that were injected up front (e.g. benchmark stubs) are kept as-is
         # Initialize Groq client
-        if GROQ_API_KEY:
-            self.groq_client = Groq(api_key=GROQ_API_KEY)
-        else:
-            print("WARNING: GROQ_API_KEY not found in environment.")
-        
+        if self.groq_client is None:
+            if GROQ_API_KEY:
+                from groq import Groq
+                self.groq_client = Groq(api_key=GROQ_API_KEY)
+            else:
+                print("WARNING: GROQ_API_KEY not found in environment.")
+
+        if self.collection is not None:
+            return
+
         # Initialize ChromaDB
         try:
+            import chromadb
+            from chromadb.utils import embedding_functions
+
             chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
             sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
                 model_name="all-MiniLM-L6-v2"
@@ -47,6 +125,7 @@ class GroqRAGService:
     
     def retrieve_context(self, query: str, n_results: int = 3) -> List[str]:
         """Retrieve relevant context from ChromaDB."""
+        self._ensure_initialized()
         if not self.collection:
             return []
         
@@ -58,16 +137,8 @@ class GroqRAGService:
         documents = results['documents'][0] if results['documents'] else []
         return documents
     
-    def generate_response(self, query: str, context: List[str]) -> str:
-        """Generate a response using Groq Llama 3.1."""
-        if not self.groq_client:
-            return "Error: Groq API key not configured."
-        
+    def _chat_messages(self, query: str, context: List[str]) -> List[Dict[str, str]]:
         context_block = "\n".join([f"- {doc}" for doc in context])
-        
-        system_prompt = """You are an expert South African construction assistant for BuildCompare SA.
-You help contractors with material selection, quantity calculations, and advice based on SANS 10400 building regulations.
-Answer concisely and practically. Use ZAR for all prices. Reference SA-specific brands when possible."""
 
         user_prompt = f"""Based on this context from our knowledge base:
 {context_block}
@@ -76,38 +147,113 @@ User question: {query}
 
 Provide a helpful, practical answer:"""
 
-        try:
-            chat_completion = self.groq_client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                model=self.model_name,
-                temperature=0.7,
-                max_tokens=1024,
-            )
-            return chat_completion.choices[0].message.content
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
-    
-    def query(self, user_query: str, n_context_results: int = 3) -> dict:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _complete(self, messages: List[Dict[str, str]], timeout: Optional[float] = None) -> str:
+        """One chat completion; raises on failure. Successful latencies feed hedge_delay()."""
+        extra = {"timeout": timeout} if timeout is not None else {}
+        started = time.perf_counter()
+        chat_completion = self.groq_client.chat.completions.create(
+            messages=messages,
+            model=self.model_name,
+            temperature=0.7,
+            max_tokens=1024,
+            **extra,
+        )
+        self._llm_latencies.append(time.perf_counter() - started)
+        return chat_completion.choices[0].message.content
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on an LLM call before hedging: the configured percentile of recent latencies."""
+        samples = sorted(self._llm_latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.default_hedge_after_s
+        return samples[min(len(samples) - 1, round((len(samples) - 1) * self.hedge_percentile / 100))]
+
+    def reset_latency_stats(self) -> None:
+        self._llm_latencies.clear()
+
+    def _generate_before(self, messages: List[Dict[str, str]], deadline: float) -> Tuple[Optional[str], int, str]:
         """
-        Full RAG pipeline: retrieve context -> generate response.
+        Race the LLM against ``deadline`` (a time.perf_counter() value). If the call
+        hasn't answered within hedge_delay(), or failed, a duplicate is sent (up to
+        max_hedges) and the first answer wins. Every call carries the remaining budget
+        as its timeout, so abandoned calls end at the deadline too.
+        Returns (answer or None, attempt that answered, failure reason).
+        """
+        if self._executor is None:
+            with self._init_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="rag-llm")
+
+        attempts: Dict[Future, int] = {}
+        pending = set()
+        reason = "timeout"
+
+        def launch() -> None:
+            future = self._executor.submit(self._complete, messages, max(deadline - time.perf_counter(), 0.001))
+            attempts[future] = len(attempts) + 1
+            pending.add(future)
+
+        launch()
+        hedge_at = time.perf_counter() + self.hedge_delay()
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return None, 0, "timeout" if pending else reason
+            can_hedge = len(attempts) <= self.max_hedges
+            wake = min(deadline, hedge_at) if can_hedge else deadline
+            done, pending = wait(pending, timeout=max(wake - now, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result(), attempts[future], ""
+                except Exception as e:
+                    reason = "error"
+                    print(f"RAG LLM attempt {attempts[future]} failed: {e}")
+            if can_hedge and (not pending or time.perf_counter() >= hedge_at):
+                launch()
+                hedge_at = time.perf_counter() + self.hedge_delay()
+            elif not pending:
+                return None, 0, reason
+
+    def query(self, user_query: str, n_context_results: int = 3, deadline_s: Optional[float] = None) -> dict:
         """
+        Full RAG pipeline: retrieve context -> generate response, within a latency budget.
+        If the LLM misses the deadline (or fails, or isn't configured) the answer is
+        extracted from the retrieved context instead; ``answered_by`` says which path won.
+        """
+        started = time.perf_counter()
+        deadline = started + (deadline_s or self.deadline_s)
         context = self.retrieve_context(user_query, n_context_results)
-        response = self.generate_response(user_query, context)
-        
+
+        answer, attempt, reason = None, 0, "not_configured"
+        if self.groq_client:
+            answer, attempt, reason = self._generate_before(self._chat_messages(user_query, context), deadline)
+
+        if answer is None:
+            answered_by, model_used = "extractive", "extractive"
+            answer = extractive_answer(user_query, context)
+        else:
+            answered_by, model_used, reason = ("llm_hedged" if attempt > 1 else "llm"), self.model_name, None
+
         return {
             "query": user_query,
             "context_retrieved": context,
-            "llm_response": response,
-            "model_used": self.model_name
+            "llm_response": answer,
+            "model_used": model_used,
+            "answered_by": answered_by,
+            "fallback_reason": reason,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
         }
     
     def generate_boq(self, specs: dict) -> dict:
         """
         Generate a structured Bill of Quantities (BoQ) from project specifications.
         """
+        self._ensure_initialized()
         if not self.groq_client:
             return {"error": "Groq API key not configured"}
             
@@ -152,5 +298,5 @@ Provide a comprehensive list of materials needed."""
             return '{"materials": []}'
 
 
-# Singleton instance
+# Singleton instance (cheap to construct; clients load on first use)
 groq_rag_service = GroqRAGService()
@@ -1,24 +1,49 @@
-from PIL import Image
 from io import BytesIO
+from typing import Any
 
-# Try importing pytesseract, set to None if missing
-try:
-    import pytesseract
-except ImportError:
-    pytesseract = None
+# Sentinel for "pytesseract not imported yet"; None means it is not installed
+_NOT_LOADED: Any = object()
 
 
 class OCRService:
+    """
+    OCR for uploaded BoQ images. Pillow and pytesseract are imported lazily on
+    first use (or by warm_up()) so importing the app stays cheap.
+    """
+
+    def __init__(self) -> None:
+        self.image_module: Any = None
+        self.pytesseract: Any = _NOT_LOADED
+
+    @property
+    def is_ready(self) -> bool:
+        return self.image_module is not None and self.pytesseract is not _NOT_LOADED
+
+    def warm_up(self) -> None:
+        """Import Pillow and pytesseract now instead of on the first upload."""
+        if self.image_module is None:
+            from PIL import Image
+            self.image_module = Image
+
+        if self.pytesseract is _NOT_LOADED:
+            # Try importing pytesseract, set to None if missing
+            try:
+                import pytesseract
+            except ImportError:
+                pytesseract = None
+            self.pytesseract = pytesseract
+
     def process_image(self, image_data: bytes) -> str:
+        self.warm_up()
         try:
-            image = Image.open(BytesIO(image_data))
+            image = self.image_module.open(BytesIO(image_data))
             # Perform OCR
             # Note: This requires Tesseract to be installed on the system and in PATH.
             # If not found, we will return a simulated response for the prototype.
             try:
-                if pytesseract is None:
+                if self.pytesseract is None:
                     raise ImportError("pytesseract module not found")
-                text = pytesseract.image_to_string(image)
+                text = self.pytesseract.image_to_string(image)
                 return text
             except (ImportError, AttributeError):
                  # Fallback for when tesseract binary/module is not found locally
@@ -0,0 +1,420 @@
+"""
+Price history and price-drop detection.
+
+Observations are stored column-wise in NumPy arrays keyed by an integer id per
+(supplier, product). Each batch of newly scraped prices is compared, vectorised,
+against the last known price and the rolling median of daily medians for its key.
+
+Raw rows are only kept for buckets that are still open. Once an hour/day closes,
+its rows are folded into hourly/daily rollups (exact min/median/max/count) and the
+raw rows are dropped, so queries and the rolling median read rollups instead of
+scanning millions of raw observations.
+"""
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.models import PriceDropEvent, PriceItem, PriceRollup
+
+GRANULARITIES: Dict[str, int] = {"hourly": 3600, "daily": 86400}
+
+OBSERVATION_DTYPE = np.dtype([("key", np.int32), ("ts", np.int64), ("price", np.float64)])
+ROLLUP_DTYPE = np.dtype([
+    ("key", np.int32),
+    ("bucket", np.int64),
+    ("min", np.float64),
+    ("median", np.float64),
+    ("max", np.float64),
+    ("count", np.int64),
+])
+
+
+def to_epoch(moment: datetime) -> int:
+    """Seconds since the epoch; naive datetimes (PriceItem.scraped_at) are treated as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def _from_epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(int(seconds), tz=timezone.utc).replace(tzinfo=None)
+
+
+def group_stats(keys: np.ndarray, buckets: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Exact min/median/max/count per (key, bucket) in one sort, no Python loop."""
+    if len(prices) == 0:
+        return np.empty(0, dtype=ROLLUP_DTYPE)
+
+    order = np.lexsort((prices, buckets, keys))
+    k, b, p = keys[order], buckets[order], prices[order]
+    boundary = np.empty(len(p), dtype=bool)
+    boundary[0] = True
+    np.not_equal(k[1:], k[:-1], out=boundary[1:])
+    boundary[1:] |= b[1:] != b[:-1]
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(p)))
+
+    out = np.empty(len(starts), dtype=ROLLUP_DTYPE)
+    out["key"] = k[starts]
+    out["bucket"] = b[starts]
+    out["min"] = p[starts]
+    out["max"] = p[starts + counts - 1]
+    out["median"] = (p[starts + (counts - 1) // 2] + p[starts + counts // 2]) / 2
+    out["count"] = counts
+    return out
+
+
+class PriceHistory:
+    """
+    In-memory price history with drop detection and time-bucketed rollups.
+
+    Drops are reported when the newest price in a batch is at least
+    ``drop_threshold_pct`` below the last known price or the rolling median of the
+    last ``median_window_days`` daily medians for that supplier/product.
+
+    Each drop is reported once: after an alert the key stays quiet while the price
+    holds, and fires again only on a further drop of the threshold below the alerted
+    price, or after the price has risen above it (re-arming the alert).
+    """
+
+    def __init__(
+        self,
+        drop_threshold_pct: float = 5.0,
+        median_window_days: int = 7,
+        max_events: int = 1000,
+    ) -> None:
+        self.drop_threshold_pct = drop_threshold_pct
+        self.median_window_days = median_window_days
+        self.events: Deque[PriceDropEvent] = deque(maxlen=max_events)
+
+        self._keys: Dict[Tuple[str, str], int] = {}
+        self._labels: List[Tuple[str, str]] = []
+        self._last_price = np.empty(0, dtype=np.float64)
+        self._last_seen = np.empty(0, dtype=np.int64)
+        self._rolling_median = np.empty(0, dtype=np.float64)
+        self._alerted_price = np.empty(0, dtype=np.float64)  # Price of the last alert, NaN when armed
+
+        # Raw rows whose day is still open (their closed hours are already in the hourly rollups)
+        self._hot: List[np.ndarray] = []
+        self._rollups: Dict[str, List[np.ndarray]] = {name: [] for name in GRANULARITIES}
+        # Buckets starting before the watermark are closed and live only in rollups
+        self._watermark: Dict[str, int] = {name: 0 for name in GRANULARITIES}
+        self._now = 0
+        self._lock = threading.Lock()
+
+    # --- Keys ---
+
+    def key_id(self, supplier: str, product: str) -> int:
+        """Integer id for a supplier/product pair, registering it on first sight."""
+        with self._lock:
+            return self._key_id(supplier, product)
+
+    def _key_id(self, supplier: str, product: str) -> int:
+        # Caller holds self._lock, so concurrent ingests can't hand out the same id twice
+        label = (supplier, product)
+        key = self._keys.get(label)
+        if key is None:
+            key = self._keys[label] = len(self._labels)
+            self._labels.append(label)
+        return key
+
+    def _grow(self) -> None:
+        size = len(self._labels)
+        if size <= len(self._last_price):
+            return
+        capacity = max(size, 2 * len(self._last_price), 64)
+        extra = capacity - len(self._last_price)
+        self._last_price = np.append(self._last_price, np.full(extra, np.nan))
+        self._last_seen = np.append(self._last_seen, np.full(extra, np.iinfo(np.int64).min))
+        self._rolling_median = np.append(self._rolling_median, np.full(extra, np.nan))
+        self._alerted_price = np.append(self._alerted_price, np.full(extra, np.nan))
+
+    # --- Ingest & detection ---
+
+    def ingest(self, items: Iterable[PriceItem]) -> List[PriceDropEvent]:
+        """Record a batch of scraped prices and return the drop events it triggered."""
+        items = list(items)
+        with self._lock:
+            keys = np.fromiter((self._key_id(item.supplier, item.product) for item in items), dtype=np.int32, count=len(items))
+        timestamps = np.fromiter((to_epoch(item.scraped_at) for item in items), dtype=np.int64, count=len(items))
+        prices = np.fromiter((item.price for item in items), dtype=np.float64, count=len(items))
+        return self.ingest_arrays(keys, timestamps, prices)
+
+    def ingest_arrays(self, keys: np.ndarray, timestamps: np.ndarray, prices: np.ndarray) -> List[PriceDropEvent]:
+        """Vectorised ingest for ids from key_id(), epoch-second timestamps and prices."""
+        if len(prices) == 0:
+            return []
+
+        with self._lock:
+            self._grow()
+            batch = np.empty(len(prices), dtype=OBSERVATION_DTYPE)
+            batch["key"], batch["ts"], batch["price"] = keys, timestamps, prices
+
+            events = self._detect(batch)
+            self._store(batch)
+            return events
+
+    def _detect(self, batch: np.ndarray) -> List[PriceDropEvent]:
+        # Newest observation per key in the batch
+        order = np.lexsort((batch["ts"], batch["key"]))
+        ordered = batch[order]
+        is_last = np.append(ordered["key"][1:] != ordered["key"][:-1], True)
+        latest = ordered[is_last]
+        keys, new = latest["key"], latest["price"]
+
+        # Out-of-order rows older than what we already know do not move "last price"
+        fresh = latest["ts"] >= self._last_seen[keys]
+        previous = self._last_price[keys]
+        median = self._rolling_median[keys]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drop_last = (previous - new) / previous * 100
+            drop_median = (median - new) / median * 100
+        hit_last = drop_last >= self.drop_threshold_pct
+        hit_median = drop_median >= self.drop_threshold_pct
+
+        # A price still sitting below the median must not alert on every scrape
+        alerted = self._alerted_price[keys]
+        armed = np.isnan(alerted)
+        with np.errstate(invalid="ignore"):
+            further = new <= alerted * (1 - self.drop_threshold_pct / 100)
+            recovered = new > alerted
+        fire = fresh & (hit_last | hit_median) & (armed | further)
+        hits = np.flatnonzero(fire)
+
+        self._alerted_price[keys[fire]] = new[fire]
+        self._alerted_price[keys[fresh & ~fire & recovered]] = np.nan
+        self._last_price[keys[fresh]] = new[fresh]
+        self._last_seen[keys[fresh]] = latest["ts"][fresh]
+
+        events = []
+        for i in hits:
+            supplier, product = self._labels[keys[i]]
+            basis = "both" if hit_last[i] and hit_median[i] else ("last_price" if hit_last[i] else "rolling_median")
+            event = PriceDropEvent(
+                supplier=supplier,
+                product=product,
+                new_price=float(new[i]),
+                previous_price=None if np.isnan(previous[i]) else float(previous[i]),
+                rolling_median=None if np.isnan(median[i]) else round(float(median[i]), 2),
+                drop_pct=round(float(np.nanmax([drop_last[i], drop_median[i]])), 2),
+                basis=basis,
+                observed_at=_from_epoch(latest["ts"][i]),
+            )
+            events.append(event)
+            self.events.append(event)
+        return events
+
+    def _store(self, batch: np.ndarray) -> None:
+        # Rows for buckets that already closed are rolled up straight away
+        for name, width in GRANULARITIES.items():
+            late = batch["ts"] // width * width < self._watermark[name]
+            if late.any():
+                rows = batch[late]
+                self._rollups[name].append(group_stats(rows["key"], rows["ts"] // width * width, rows["price"]))
+                if name == "daily":
+                    batch = batch[~late]
+
+        self._hot.append(batch)
+        newest = int(batch["ts"].max()) if len(batch) else self._now
+        if newest > self._now:
+            self._now = newest
+            if self._now // GRANULARITIES["hourly"] * GRANULARITIES["hourly"] > self._watermark["hourly"]:
+                self._compact(self._now)
+
+    # --- Rollups ---
+
+    def compact(self, now: Optional[datetime] = None) -> None:
+        """Fold every closed hour/day into rollups and drop raw rows that are no longer needed."""
+        with self._lock:
+            self._compact(to_epoch(now) if now else self._now)
+
+    def _compact(self, now: int) -> None:
+        hot = np.concatenate(self._hot) if len(self._hot) > 1 else (self._hot[0] if self._hot else np.empty(0, dtype=OBSERVATION_DTYPE))
+        daily_closed = False
+
+        for name, width in GRANULARITIES.items():
+            current = now // width * width
+            start = self._watermark[name]
+            if current <= start:
+                continue
+            buckets = hot["ts"] // width * width
+            closing = (buckets >= start) & (buckets < current)
+            if closing.any():
+                rows = hot[closing]
+                self._rollups[name].append(group_stats(rows["key"], buckets[closing], rows["price"]))
+            self._watermark[name] = current
+            daily_closed = daily_closed or name == "daily"
+
+        if daily_closed:
+            hot = hot[hot["ts"] >= self._watermark["daily"]]
+            self._refresh_rolling_median()
+        self._hot = [hot] if len(hot) else []
+
+    def _rollup_table(self, granularity: str) -> np.ndarray:
+        chunks = self._rollups[granularity]
+        if len(chunks) > 1:
+            # Consolidate so later reads are a single array scan
+            self._rollups[granularity] = chunks = [np.concatenate(chunks)]
+        return chunks[0] if chunks else np.empty(0, dtype=ROLLUP_DTYPE)
+
+    def _refresh_rolling_median(self) -> None:
+        daily = self._rollup_table("daily")
+        cutoff = self._watermark["daily"] - self.median_window_days * GRANULARITIES["daily"]
+        window = daily[daily["bucket"] >= cutoff]
+        self._rolling_median[:] = np.nan
+        if len(window):
+            stats = group_stats(window["key"], np.zeros(len(window), dtype=np.int64), window["median"])
+            self._rolling_median[stats["key"]] = stats["median"]
+
+    def rollups(
+        self,
+        supplier: str,
+        product: str,
+        granularity: str = "daily",
+        since: Optional[datetime] = None,
+    ) -> List[PriceRollup]:
+        """
+        Hourly or daily min/median/max for one supplier/product, oldest first.
+        The current (still open) bucket is included, computed from its raw rows.
+        If late observations split a closed bucket, the pieces are merged with exact
+        min/max/count and a count-weighted median.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        width = GRANULARITIES[granularity]
+
+        with self._lock:
+            key = self._keys.get((supplier, product))
+            if key is None:
+                return []
+            table = self._rollup_table(granularity)
+            rows = table[table["key"] == key]
+
+            hot = [chunk[chunk["key"] == key] for chunk in self._hot]
+            hot = np.concatenate(hot) if hot else np.empty(0, dtype=OBSERVATION_DTYPE)
+            buckets = hot["ts"] // width * width
+            open_rows = hot[buckets >= self._watermark[granularity]]
+            rows = np.concatenate([rows, group_stats(open_rows["key"], open_rows["ts"] // width * width, open_rows["price"])])
+
+        if since is not None:
+            rows = rows[rows["bucket"] >= to_epoch(since) // width * width]
+        return [self._to_model(key, granularity, merged) for merged in self._merge_buckets(rows)]
+
+    def iter_rollups(
+        self,
+        granularity: str = "daily",
+        since: Optional[datetime] = None,
+        supplier: Optional[str] = None,
+    ) -> Iterator[Tuple[str, str, datetime, float, float, float, int]]:
+        """
+        Rollups for every product (optionally one supplier's) as
+        (supplier, product, bucket_start, min, median, max, count) tuples, grouped by
+        product and oldest first, for exports. The rollup arrays are snapshotted under
+        the lock; rows are then produced lazily, a block at a time.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        width = GRANULARITIES[granularity]
+
+        with self._lock:
+            table = self._rollup_table(granularity)
+            hot = np.concatenate(self._hot) if self._hot else np.empty(0, dtype=OBSERVATION_DTYPE)
+            open_rows = hot[hot["ts"] // width * width >= self._watermark[granularity]]
+            rows = np.concatenate([table, group_stats(open_rows["key"], open_rows["ts"] // width * width, open_rows["price"])])
+            labels = list(self._labels)
+
+        if since is not None:
+            rows = rows[rows["bucket"] >= to_epoch(since) // width * width]
+        if supplier is not None:
+            rows = rows[np.isin(rows["key"], [key for key, label in enumerate(labels) if label[0] == supplier])]
+        return self._iter_merged(rows, np.lexsort((rows["bucket"], rows["key"])), labels)
+
+    @staticmethod
+    def _iter_merged(
+        rows: np.ndarray,
+        order: np.ndarray,
+        labels: List[Tuple[str, str]],
+        block: int = 4096,
+    ) -> Iterator[Tuple[str, str, datetime, float, float, float, int]]:
+        current = None  # [key, bucket, min, weighted median sum, max, count]
+
+        def emit(entry: list) -> Tuple[str, str, datetime, float, float, float, int]:
+            supplier, product = labels[entry[0]]
+            return (
+                supplier, product, _from_epoch(entry[1]),
+                round(entry[2], 2), round(entry[3] / entry[5], 2), round(entry[4], 2), entry[5],
+            )
+
+        for start in range(0, len(order), block):
+            chunk = rows[order[start:start + block]]
+            for key, bucket, low, median, high, count in zip(*(chunk[field].tolist() for field in ROLLUP_DTYPE.names)):
+                if current is not None and current[0] == key and current[1] == bucket:
+                    # Late rows split this bucket: merge as in _merge_buckets
+                    current[2] = min(current[2], low)
+                    current[3] += median * count
+                    current[4] = max(current[4], high)
+                    current[5] += count
+                    continue
+                if current is not None:
+                    yield emit(current)
+                current = [key, bucket, low, median * count, high, count]
+        if current is not None:
+            yield emit(current)
+
+    @staticmethod
+    def _merge_buckets(rows: np.ndarray) -> List[Tuple[int, float, float, float, int]]:
+        merged: Dict[int, List[float]] = {}
+        for row in np.sort(rows, order="bucket"):
+            bucket = int(row["bucket"])
+            if bucket not in merged:
+                merged[bucket] = [row["min"], row["median"] * row["count"], row["max"], row["count"]]
+            else:
+                entry = merged[bucket]
+                entry[0] = min(entry[0], row["min"])
+                entry[1] += row["median"] * row["count"]
+                entry[2] = max(entry[2], row["max"])
+                entry[3] += row["count"]
+        return [(bucket, lo, weighted / count, hi, int(count)) for bucket, (lo, weighted, hi, count) in merged.items()]
+
+    def _to_model(self, key: int, granularity: str, merged: Tuple[int, float, float, float, int]) -> PriceRollup:
+        bucket, lo, median, hi, count = merged
+        supplier, product = self._labels[key]
+        return PriceRollup(
+            supplier=supplier,
+            product=product,
+            granularity=granularity,
+            bucket_start=_from_epoch(bucket),
+            min_price=round(float(lo), 2),
+            median_price=round(float(median), 2),
+            max_price=round(float(hi), 2),
+            count=count,
+        )
+
+    def recent_events(self, since: Optional[datetime] = None, limit: int = 100) -> List[PriceDropEvent]:
+        """Most recent drop events first."""
+        if since is not None and since.tzinfo is not None:
+            # observed_at is naive UTC, like PriceItem.scraped_at
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        with self._lock:
+            snapshot = list(self.events)
+        events = [event for event in reversed(snapshot) if since is None or event.observed_at >= since]
+        return events[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._labels),
+                "hot_rows": int(sum(len(chunk) for chunk in self._hot)),
+                **{f"{name}_rollups": int(sum(len(chunk) for chunk in self._rollups[name])) for name in GRANULARITIES},
+            }
+
+
+# Singleton instance
+price_history = PriceHistory(
+    drop_threshold_pct=float(os.getenv("PRICE_DROP_THRESHOLD_PCT", "5.0")),
+    median_window_days=int(os.getenv("PRICE_MEDIAN_WINDOW_DAYS", "7")),
+)
@@ -0,0 +1,369 @@
+"""
+Server-side writes to the Supabase project tables (`projects`, `project_materials`,
+`boq_history`, see supabase/schema.sql).
+
+A whole BoQ is saved in one transaction: one `boq_history` row with the raw
+materials, the line items bulk-inserted into `project_materials` (streamed COPY on
+Postgres, chunked multi-row INSERTs on the SQLite stand-in), and the project's `total_budget`
+adjusted by the saved lines' value instead of re-summing every material.
+
+Postgres is used when SUPABASE_DB_URL is set (needs psycopg 3, imported only then,
+so importing the app stays cheap). Otherwise a local SQLite file with the same tables
+stands in, for development, tests and benchmarks.
+"""
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from backend.models import ProjectBoQSaveResponse, ProjectMaterialIn
+from backend.responses import dumps
+
+# `id` is left to the column default (uuid_generate_v4() on Postgres), as the frontend does
+MATERIAL_COLUMNS = ("project_id", "name", "brand", "category", "quantity", "unit", "estimated_price")
+
+CENT = Decimal("0.01")
+
+# Priced BoQ lines as exported: the stored columns plus the line total (NULL when unpriced)
+EXPORT_SELECT = (
+    "SELECT name, brand, category, quantity, unit, estimated_price, "
+    "ROUND(quantity * estimated_price, 2) FROM project_materials WHERE project_id = {param}"
+)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    location TEXT,
+    total_budget NUMERIC DEFAULT 0.00,
+    spent NUMERIC DEFAULT 0.00,
+    status TEXT DEFAULT 'active',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS project_materials (
+    id TEXT PRIMARY KEY DEFAULT (
+        lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' ||
+        substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', abs(random()) % 4 + 1, 1) ||
+        substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))
+    ),
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    brand TEXT,
+    category TEXT,
+    quantity NUMERIC NOT NULL DEFAULT 1,
+    unit TEXT NOT NULL DEFAULT 'units',
+    estimated_price NUMERIC,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS project_materials_project_id ON project_materials (project_id);
+CREATE TABLE IF NOT EXISTS boq_history (
+    id TEXT PRIMARY KEY,
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    file_name TEXT,
+    file_url TEXT,
+    extracted_data TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class ProjectNotFound(LookupError):
+    """The project doesn't exist or belongs to another user."""
+
+
+def _uuid_or_none(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _cents(value: float) -> Decimal:
+    """``value`` to 2 dp, rounded half away from zero like the NUMERIC columns."""
+    return Decimal(repr(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_value(material: ProjectMaterialIn) -> float:
+    """
+    What one line adds to the project budget (unpriced lines add nothing), from the
+    same rounded quantity and price that are stored, so a later replace removes exactly it.
+    """
+    if material.estimated_price is None:
+        return 0.0
+    return float((_cents(material.quantity) * _cents(material.estimated_price)).quantize(CENT, rounding=ROUND_HALF_UP))
+
+
+def chunked(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _material_rows(project_id: str, materials: Sequence[ProjectMaterialIn]) -> List[Tuple[Any, ...]]:
+    return [
+        (
+            project_id,
+            material.name,
+            material.brand,
+            material.category,
+            float(_cents(material.quantity)),
+            material.unit,
+            float(_cents(material.estimated_price)) if material.estimated_price is not None else None,
+        )
+        for material in materials
+    ]
+
+
+def _extracted_data(materials: Sequence[ProjectMaterialIn]) -> str:
+    lines = [{field: value for field, value in vars(material).items() if value is not None} for material in materials]
+    return dumps({"materials": lines}).decode()
+
+
+class SQLiteProjectStore:
+    """Local stand-in for the Supabase Postgres project tables."""
+
+    def __init__(self, path: str = "./project_store.sqlite3", chunk_size: int = 500) -> None:
+        self.path = path
+        # 7 columns per row keeps each statement well under SQLite's bound-parameter limit
+        self.chunk_size = chunk_size
+        with closing(self._connect()) as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        # Transactions are explicit
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def create_project(self, user_id: str, name: str, total_budget: float = 0.0) -> str:
+        project_id = str(uuid.uuid4())
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO projects (id, user_id, name, total_budget) VALUES (?, ?, ?, ?)",
+                (project_id, user_id, name, total_budget),
+            )
+        return project_id
+
+    def save_boq(
+        self,
+        project_id: str,
+        user_id: str,
+        materials: Sequence[ProjectMaterialIn],
+        file_name: Optional[str] = None,
+        file_url: Optional[str] = None,
+        replace: bool = False,
+    ) -> ProjectBoQSaveResponse:
+        started = time.perf_counter()
+        rows = _material_rows(project_id, materials)
+        added = round(sum(line_value(material) for material in materials), 2)
+        boq_id = str(uuid.uuid4())
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM projects WHERE id = ? AND user_id = ?", (project_id, user_id)).fetchone() is None:
+                raise ProjectNotFound(project_id)
+
+            removed = 0.0
+            if replace:
+                removed = conn.execute(
+                    "SELECT COALESCE(SUM(ROUND(quantity * COALESCE(estimated_price, 0), 2)), 0) FROM project_materials WHERE project_id = ?",
+                    (project_id,),
+                ).fetchone()[0]
+                conn.execute("DELETE FROM project_materials WHERE project_id = ?", (project_id,))
+
+            conn.execute(
+                "INSERT INTO boq_history (id, project_id, file_name, file_url, extracted_data) VALUES (?, ?, ?, ?, ?)",
+                (boq_id, project_id, file_name, file_url, _extracted_data(materials)),
+            )
+            row_sql = "(" + ", ".join("?" * len(MATERIAL_COLUMNS)) + ")"
+            for chunk in chunked(rows, self.chunk_size):
+                conn.execute(
+                    f"INSERT INTO project_materials ({', '.join(MATERIAL_COLUMNS)}) VALUES {', '.join([row_sql] * len(chunk))}",
+                    [value for row in chunk for value in row],
+                )
+            total_budget = conn.execute(
+                "UPDATE projects SET total_budget = ROUND(total_budget + ?, 2), updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ? RETURNING total_budget",
+                (round(added - removed, 2), project_id),
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return ProjectBoQSaveResponse(
+            project_id=project_id,
+            boq_id=boq_id,
+            materials_saved=len(rows),
+            boq_total=added,
+            total_budget=float(total_budget),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+
+    def iter_materials(self, project_id: str, user_id: str, batch_size: int = 1000) -> Iterator[Tuple[Any, ...]]:
+        """
+        The project's materials as (name, brand, category, quantity, unit, estimated_price,
+        line_total) rows in insertion order, fetched ``batch_size`` at a time. Ownership is
+        checked now (ProjectNotFound); rows are read as the iterator is consumed, which may
+        be from another thread (a StreamingResponse pulls from the threadpool).
+        """
+        conn = self._connect(check_same_thread=False)
+        try:
+            if conn.execute("SELECT 1 FROM projects WHERE id = ? AND user_id = ?", (project_id, user_id)).fetchone() is None:
+                raise ProjectNotFound(project_id)
+        except Exception:
+            conn.close()
+            raise
+        return self._fetch_batches(conn, EXPORT_SELECT.format(param="?") + " ORDER BY rowid", (project_id,), batch_size)
+
+    @staticmethod
+    def _fetch_batches(conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...], batch_size: int) -> Iterator[Tuple[Any, ...]]:
+        with closing(conn):
+            cursor = conn.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    return
+                yield from batch
+
+
+class PostgresProjectStore:
+    """The Supabase Postgres tables over a direct connection (bypasses RLS, so ownership is checked here)."""
+
+    def __init__(self, dsn: str) -> None:
+        try:
+            import psycopg
+        except ImportError as exc:
+            raise RuntimeError("psycopg is not installed") from exc
+        self.psycopg = psycopg
+        self.dsn = dsn
+
+    def create_project(self, user_id: str, name: str, total_budget: float = 0.0) -> str:
+        with self.psycopg.connect(self.dsn) as conn:
+            row = conn.execute(
+                "INSERT INTO projects (user_id, name, total_budget) VALUES (%s, %s, %s) RETURNING id",
+                (user_id, name, total_budget),
+            ).fetchone()
+        return str(row[0])
+
+    def save_boq(
+        self,
+        project_id: str,
+        user_id: str,
+        materials: Sequence[ProjectMaterialIn],
+        file_name: Optional[str] = None,
+        file_url: Optional[str] = None,
+        replace: bool = False,
+    ) -> ProjectBoQSaveResponse:
+        started = time.perf_counter()
+        rows = _material_rows(project_id, materials)
+        added = round(sum(line_value(material) for material in materials), 2)
+
+        # The id columns are UUIDs: anything else can't match a project (and would be a cast error)
+        if _uuid_or_none(project_id) is None or _uuid_or_none(user_id) is None:
+            raise ProjectNotFound(project_id)
+
+        # One transaction: committed when the block exits cleanly, rolled back on error
+        with self.psycopg.connect(self.dsn) as conn:
+            owned = conn.execute(
+                "SELECT 1 FROM projects WHERE id = %s AND user_id = %s FOR UPDATE",
+                (project_id, user_id),
+            ).fetchone()
+            if owned is None:
+                raise ProjectNotFound(project_id)
+
+            removed = 0.0
+            if replace:
+                removed = conn.execute(
+                    "WITH gone AS (DELETE FROM project_materials WHERE project_id = %s "
+                    "RETURNING ROUND(quantity * COALESCE(estimated_price, 0), 2) AS value) "
+                    "SELECT COALESCE(SUM(value), 0) FROM gone",
+                    (project_id,),
+                ).fetchone()[0]
+
+            boq_id = conn.execute(
+                "INSERT INTO boq_history (project_id, file_name, file_url, extracted_data) "
+                "VALUES (%s, %s, %s, %s::jsonb) RETURNING id",
+                (project_id, file_name, file_url, _extracted_data(materials)),
+            ).fetchone()[0]
+
+            # COPY streams the rows (psycopg flushes its buffer as it fills), so large
+            # BoQs need no explicit chunking here
+            with conn.cursor() as cursor:
+                with cursor.copy(f"COPY project_materials ({', '.join(MATERIAL_COLUMNS)}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+
+            total_budget = conn.execute(
+                "UPDATE projects SET total_budget = total_budget + %s, updated_at = NOW() "
+                "WHERE id = %s RETURNING total_budget",
+                (round(added - float(removed), 2), project_id),
+            ).fetchone()[0]
+
+        return ProjectBoQSaveResponse(
+            project_id=project_id,
+            boq_id=str(boq_id),
+            materials_saved=len(rows),
+            boq_total=added,
+            total_budget=float(total_budget),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+
+    def iter_materials(self, project_id: str, user_id: str, batch_size: int = 1000) -> Iterator[Tuple[Any, ...]]:
+        """Same rows as SQLiteProjectStore.iter_materials, streamed through a server-side cursor."""
+        if _uuid_or_none(project_id) is None or _uuid_or_none(user_id) is None:
+            raise ProjectNotFound(project_id)
+        conn = self.psycopg.connect(self.dsn)
+        try:
+            owned = conn.execute("SELECT 1 FROM projects WHERE id = %s AND user_id = %s", (project_id, user_id)).fetchone()
+            if owned is None:
+                raise ProjectNotFound(project_id)
+        except Exception:
+            conn.close()
+            raise
+        return self._fetch_batches(conn, project_id, batch_size)
+
+    @staticmethod
+    def _fetch_batches(conn, project_id: str, batch_size: int) -> Iterator[Tuple[Any, ...]]:
+        with conn:
+            # A named cursor keeps the result set on the server; itersize rows per round trip
+            with conn.cursor(name="project_materials_export") as cursor:
+                cursor.itersize = batch_size
+                # Rows saved together share created_at (NOW() is per transaction); ctid keeps COPY order
+                cursor.execute(EXPORT_SELECT.format(param="%s") + " ORDER BY created_at, ctid", (project_id,))
+                for name, brand, category, quantity, unit, price, total in cursor:
+                    yield (
+                        name, brand, category, float(quantity), unit,
+                        float(price) if price is not None else None,
+                        float(total) if total is not None else None,
+                    )
+
+
+def _default_store():
+    dsn = os.getenv("SUPABASE_DB_URL")
+    if dsn:
+        try:
+            return PostgresProjectStore(dsn)
+        except RuntimeError:
+            print("WARNING: SUPABASE_DB_URL is set but psycopg is not installed; using the local SQLite project store.")
+    return SQLiteProjectStore(os.getenv("PROJECT_DB_PATH", "./project_store.sqlite3"))
+
+
+_store = None
+
+
+def get_project_store():
+    """The configured store, opened on first use (also the FastAPI dependency for the projects router)."""
+    global _store
+    if _store is None:
+        _store = _default_store()
+    return _store
@@ -0,0 +1,230 @@
+"""
+Per-user token-bucket rate limiting and admission control for the expensive endpoints.
+
+Every caller (the authenticated user, or the client IP when anonymous) owns one
+bucket of ``capacity`` tokens refilled at ``refill_per_sec``; each limited endpoint
+charges its own cost, so a BoQ estimate drains the bucket faster than a RAG query.
+Buckets live in this process by default, or in Redis (RATE_LIMIT_REDIS_URL) so all
+workers share them. Separately, each worker sheds load once ``max_in_flight``
+limited requests are already running. Both rejections are 429s with Retry-After.
+"""
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+# Try importing redis, set to None if missing (buckets then stay in-process)
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+USAGE_FIELDS = ("allowed", "rejected", "tokens")
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    remaining: float
+    retry_after: float  # Seconds until the requested cost is affordable
+
+
+class MemoryBucketStore:
+    """Buckets and usage counters held in this worker's memory."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # identity -> (tokens, updated_at)
+        self._usage: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    async def take(
+        self,
+        identity: str,
+        endpoint: str,
+        cost: float,
+        capacity: float,
+        refill_per_sec: float,
+    ) -> RateLimitDecision:
+        with self._lock:
+            now = self.clock()
+            tokens, updated_at = self._buckets.pop(identity, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_sec)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[identity] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                del self._buckets[next(iter(self._buckets))]  # Least recently used first
+
+            counters = self._usage.setdefault(identity, {}).setdefault(endpoint, dict.fromkeys(USAGE_FIELDS, 0))
+            counters["allowed" if allowed else "rejected"] += 1
+            if allowed:
+                counters["tokens"] += int(cost)
+            while len(self._usage) > self.max_keys:
+                del self._usage[next(iter(self._usage))]
+
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_sec
+        return RateLimitDecision(allowed, tokens, retry_after)
+
+    async def usage(self, identity: str) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._usage.get(identity, {}).items()}
+
+
+class RedisBucketStore:
+    """
+    Buckets shared by every worker through Redis. Refill, take and the usage counters
+    run in one Lua script (one round trip, atomic), timed by the Redis server clock so
+    workers with skewed clocks agree.
+    """
+
+    TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+  redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':allowed', 1)
+  redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':tokens', math.floor(cost))
+else
+  redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':rejected', 1)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[5]))
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit", usage_ttl_s: int = 30 * 86400) -> None:
+        if redis is None:
+            raise RuntimeError("redis is not installed")
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.usage_ttl_s = usage_ttl_s
+        self._take = self.client.register_script(self.TAKE_SCRIPT)
+
+    async def take(
+        self,
+        identity: str,
+        endpoint: str,
+        cost: float,
+        capacity: float,
+        refill_per_sec: float,
+    ) -> RateLimitDecision:
+        allowed, tokens = await self._take(
+            keys=[f"{self.prefix}:bucket:{identity}", f"{self.prefix}:usage:{identity}"],
+            args=[capacity, refill_per_sec, cost, endpoint, self.usage_ttl_s],
+        )
+        tokens = float(tokens)
+        if allowed:
+            return RateLimitDecision(True, tokens, 0.0)
+        return RateLimitDecision(False, tokens, (cost - tokens) / refill_per_sec)
+
+    async def usage(self, identity: str) -> Dict[str, Dict[str, int]]:
+        raw = await self.client.hgetall(f"{self.prefix}:usage:{identity}")
+        usage: Dict[str, Dict[str, int]] = {}
+        for field, value in raw.items():
+            endpoint, counter = field.decode().rsplit(":", 1)
+            usage.setdefault(endpoint, dict.fromkeys(USAGE_FIELDS, 0))[counter] = int(value)
+        return usage
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller is over their budget or the worker is saturated."""
+
+    def __init__(self, detail: str, retry_after: float) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """
+    Token buckets per caller with per-endpoint costs, plus a per-worker cap on
+    concurrently running limited requests (load shedding).
+    """
+
+    def __init__(
+        self,
+        store=None,
+        capacity: float = 60,
+        refill_per_sec: float = 1.0,
+        max_in_flight: int = 32,
+        costs: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.store = store or MemoryBucketStore()
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.max_in_flight = max_in_flight
+        self.costs: Dict[str, float] = costs or {}
+        self.enabled = enabled
+        self.in_flight = 0
+        self.shed = 0  # Requests rejected because the worker was saturated
+
+    def cost(self, endpoint: str) -> float:
+        return self.costs.get(endpoint, 1)
+
+    def admit(self) -> None:
+        """Reserve a slot for a limited request, or shed it when the worker is saturated."""
+        if self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            raise RateLimitExceeded("Server is busy, please retry shortly", retry_after=1.0)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    async def check(self, identity: str, endpoint: str) -> RateLimitDecision:
+        """Charge ``identity`` the endpoint's cost; raises RateLimitExceeded if the bucket is short."""
+        cost = self.cost(endpoint)
+        decision = await self.store.take(identity, endpoint, cost, self.capacity, self.refill_per_sec)
+        if not decision.allowed:
+            raise RateLimitExceeded(f"Rate limit exceeded for {endpoint}", retry_after=decision.retry_after)
+        return decision
+
+    async def usage(self, identity: str) -> Dict[str, Dict[str, int]]:
+        return await self.store.usage(identity)
+
+
+def _default_store():
+    url = os.getenv("RATE_LIMIT_REDIS_URL")
+    if url:
+        if redis is not None:
+            return RedisBucketStore(url)
+        print("WARNING: RATE_LIMIT_REDIS_URL is set but redis is not installed; using in-memory rate limits.")
+    return MemoryBucketStore()
+
+
+# Tokens charged per call; the bucket holds RATE_LIMIT_CAPACITY and refills RATE_LIMIT_REFILL_PER_SEC
+ENDPOINT_COSTS: Dict[str, float] = {
+    "estimator": 10,  # Groq JSON-mode BoQ generation
+    "ocr": 5,  # Tesseract on the worker CPU
+    "rag": 3,  # Retrieval + Groq chat completion
+    "optimize": 2,  # Basket MILP / heuristic
+}
+
+# Singleton instance
+rate_limiter = RateLimiter(
+    store=_default_store(),
+    capacity=float(os.getenv("RATE_LIMIT_CAPACITY", "60")),
+    refill_per_sec=float(os.getenv("RATE_LIMIT_REFILL_PER_SEC", "0.5")),
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32")),
+    costs=ENDPOINT_COSTS,
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false",
+)
@@ -0,0 +1,326 @@
+"""
+Retailer listing parsers: turn a search/category page into PriceItems.
+
+Parsing is selective and streaming. Embedded JSON-LD is located with a byte-level
+scan (no DOM at all) and is used whenever it lists products. Otherwise the page is
+fed chunk by chunk into lxml's pull parser; only product tiles are inspected and
+every finished element is cleared, so memory stays flat regardless of page size.
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from lxml import etree
+
+from backend.models import PriceItem
+
+Source = Union[bytes, str, Iterable[bytes]]
+
+CHUNK_SIZE = 16 * 1024
+
+_JSON_LD_RE = re.compile(
+    rb'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+_PRICE_CHARS_RE = re.compile(r"[^0-9.,]")
+_QUANTITY_RE = re.compile(r"(\d+)\s+(?:in stock|available|units? left)", re.IGNORECASE)
+_OUT_OF_STOCK_WORDS = ("out of stock", "out_of_stock", "outofstock", "sold out", "unavailable", "discontinued")
+
+
+def parse_price(text: Optional[str]) -> Optional[float]:
+    """
+    Parse South African price strings: "R 1 299,95", "R1,299.95", "1299.95", "R89".
+    Returns None when no positive amount can be read.
+    """
+    if not text:
+        return None
+    digits = _PRICE_CHARS_RE.sub("", str(text))
+    if not digits:
+        return None
+
+    if "," in digits and "." in digits:
+        # Whichever separator comes last is the decimal point
+        if digits.rfind(",") > digits.rfind("."):
+            digits = digits.replace(".", "").replace(",", ".")
+        else:
+            digits = digits.replace(",", "")
+    elif "," in digits:
+        whole, _, fraction = digits.rpartition(",")
+        digits = f"{whole.replace(',', '')}.{fraction}" if len(fraction) <= 2 else digits.replace(",", "")
+
+    try:
+        value = float(digits)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def parse_stock(text: Optional[str]) -> bool:
+    """True unless the stock label/schema value says the item is unavailable."""
+    if not text:
+        return True
+    lowered = str(text).lower()
+    return not any(word in lowered for word in _OUT_OF_STOCK_WORDS)
+
+
+def extract_json_ld(html: bytes) -> List[Any]:
+    """All JSON-LD blocks on the page, found without building a DOM. Invalid blocks are skipped."""
+    blocks = []
+    for match in _JSON_LD_RE.finditer(html):
+        try:
+            blocks.append(json.loads(match.group(1)))
+        except ValueError:
+            continue
+    return blocks
+
+
+def _iter_json_ld_products(node: Any) -> Iterator[Dict[str, Any]]:
+    """Walk JSON-LD (lists, @graph, ItemList/ListItem nesting) yielding Product objects."""
+    if isinstance(node, list):
+        for child in node:
+            yield from _iter_json_ld_products(child)
+        return
+    if not isinstance(node, dict):
+        return
+
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    if "Product" in types:
+        yield node
+        return
+    for key in ("@graph", "itemListElement", "item"):
+        if key in node:
+            yield from _iter_json_ld_products(node[key])
+
+
+def _chunks(data: bytes, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _has_class(element: Any, name: str) -> bool:
+    classes = element.get("class")
+    return bool(classes) and name in classes.split()
+
+
+class RetailerParser:
+    """
+    Base parser. Subclasses describe where a retailer keeps product data:
+    the CSS class of a product tile and of the fields inside it, and whether
+    the JSON-LD on the page should be trusted first.
+    """
+
+    supplier: str = ""
+    base_url: str = ""
+    json_ld_first: bool = False
+    tile_class: str = ""
+    name_class: str = ""
+    price_class: str = "price"
+    stock_class: str = ""
+    link_class: str = ""
+
+    def parse(self, source: Source) -> List[PriceItem]:
+        """
+        Parse a full page (bytes/str) or an iterable of byte chunks such as
+        ``httpx.Response.iter_bytes()``.
+        """
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        if isinstance(source, bytes):
+            if self.json_ld_first:
+                items = self.parse_json_ld(extract_json_ld(source))
+                if items:
+                    return items
+            source = _chunks(source)
+        return self._stream_tiles(source)
+
+    def parse_json_ld(self, blocks: List[Any]) -> List[PriceItem]:
+        items = []
+        for product in _iter_json_ld_products(blocks):
+            item = self._item_from_json_ld(product)
+            if item is not None:
+                items.append(item)
+        return items
+
+    def _item_from_json_ld(self, product: Dict[str, Any]) -> Optional[PriceItem]:
+        offers = product.get("offers") or {}
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        price = parse_price(offers.get("price") or offers.get("lowPrice"))
+        name = product.get("name")
+        if not name or price is None:
+            return None
+
+        inventory = offers.get("inventoryLevel")
+        quantity = inventory.get("value") if isinstance(inventory, dict) else inventory
+        return PriceItem(
+            supplier=self.supplier,
+            product=str(name).strip(),
+            price=price,
+            currency=offers.get("priceCurrency") or "ZAR",
+            in_stock=parse_stock(offers.get("availability")),
+            stock_quantity=int(quantity) if quantity is not None else None,
+            link=self._absolute(offers.get("url") or product.get("url")),
+        )
+
+    def _stream_tiles(self, chunks: Iterable[bytes]) -> List[PriceItem]:
+        parser = etree.HTMLPullParser(events=("start", "end"))
+        items: List[PriceItem] = []
+        json_ld: List[bytes] = []
+        tile_depth = 0
+
+        def events() -> Iterator[Any]:
+            for chunk in chunks:
+                parser.feed(chunk)
+                yield from parser.read_events()
+            parser.close()
+            yield from parser.read_events()
+
+        for event, element in events():
+            is_tile = _has_class(element, self.tile_class)
+            if event == "start":
+                tile_depth += is_tile
+                continue
+
+            if is_tile:
+                tile_depth -= 1
+                item = self._item_from_tile(element)
+                if item is not None:
+                    items.append(item)
+            elif tile_depth:
+                continue  # Still needed by the enclosing tile
+            elif element.tag == "script" and "ld+json" in (element.get("type") or ""):
+                json_ld.append((element.text or "").encode("utf-8"))
+
+            # Drop the finished subtree and any already-processed siblings
+            element.clear()
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+        if items and not self.json_ld_first:
+            return items
+        # JSON-LD preferred, or no tiles matched: use whatever JSON-LD the stream contained
+        blocks = []
+        for raw in json_ld:
+            try:
+                blocks.append(json.loads(raw))
+            except ValueError:
+                continue
+        return self.parse_json_ld(blocks) or items
+
+    def _find(self, tile: Any, class_name: str) -> Optional[Any]:
+        if not class_name:
+            return None
+        for element in tile.iter():
+            if _has_class(element, class_name):
+                return element
+        return None
+
+    def _text(self, element: Optional[Any]) -> Optional[str]:
+        if element is None:
+            return None
+        text = " ".join("".join(element.itertext()).split())
+        return text or None
+
+    def _absolute(self, href: Optional[str]) -> Optional[str]:
+        if not href:
+            return None
+        return href if href.startswith("http") else f"{self.base_url}{href}"
+
+    def _item_from_tile(self, tile: Any) -> Optional[PriceItem]:
+        name = self._text(self._find(tile, self.name_class))
+        price = parse_price(self._text(self._find(tile, self.price_class)))
+        if not name or price is None:
+            return None
+
+        link = self._find(tile, self.link_class)
+        stock_text = self._text(self._find(tile, self.stock_class))
+        in_stock = parse_stock(stock_text)
+        quantity = _QUANTITY_RE.search(stock_text) if stock_text else None
+        return PriceItem(
+            supplier=self.supplier,
+            product=name,
+            price=price,
+            in_stock=in_stock,
+            stock_quantity=(int(quantity.group(1)) if quantity else None) if in_stock else 0,
+            link=self._absolute(link.get("href") if link is not None else None),
+        )
+
+
+class BuildersParser(RetailerParser):
+    """Builders Warehouse: product tiles carry name, price and stock as data attributes."""
+
+    supplier = "Builders Warehouse"
+    base_url = "https://www.builders.co.za"
+    tile_class = "product-tile"
+    name_class = "product-tile__title"
+    stock_class = "product-tile__stock"
+    link_class = "product-tile__link"
+
+    def _item_from_tile(self, tile: Any) -> Optional[PriceItem]:
+        price = parse_price(tile.get("data-price"))
+        name = tile.get("data-name")
+        if not name or price is None:
+            # Attributes missing: read the visible markup instead
+            return super()._item_from_tile(tile)
+
+        quantity = tile.get("data-stock-qty")
+        link = self._find(tile, self.link_class)
+        return PriceItem(
+            supplier=self.supplier,
+            product=name.strip(),
+            price=price,
+            in_stock=parse_stock(tile.get("data-stock")),
+            stock_quantity=int(quantity) if quantity and quantity.isdigit() else None,
+            link=self._absolute(link.get("href") if link is not None else None),
+        )
+
+
+class CashbuildParser(RetailerParser):
+    """Cashbuild: Magento product list items, prices and stock labels in the markup."""
+
+    supplier = "Cashbuild"
+    base_url = "https://www.cashbuild.co.za"
+    tile_class = "product-item"
+    name_class = "product-item-link"
+    stock_class = "stock"
+    link_class = "product-item-link"
+
+
+class LeroyMerlinParser(RetailerParser):
+    """Leroy Merlin: schema.org ItemList in JSON-LD, with visual cards as a fallback."""
+
+    supplier = "Leroy Merlin"
+    base_url = "https://leroymerlin.co.za"
+    json_ld_first = True
+    tile_class = "lm-card"
+    name_class = ""
+    price_class = "lm-card__price"
+
+    def _item_from_tile(self, tile: Any) -> Optional[PriceItem]:
+        heading = next(tile.iter("h2"), None)
+        anchor = next(tile.iter("a"), None)
+        name = self._text(heading)
+        price = parse_price(self._text(self._find(tile, self.price_class)))
+        if not name or price is None:
+            return None
+        return PriceItem(
+            supplier=self.supplier,
+            product=name,
+            price=price,
+            link=self._absolute(anchor.get("href") if anchor is not None else None),
+        )
+
+
+RETAILER_PARSERS: Dict[str, RetailerParser] = {
+    parser.supplier: parser
+    for parser in (BuildersParser(), CashbuildParser(), LeroyMerlinParser())
+}
+
+
+def get_parser(supplier: str) -> RetailerParser:
+    try:
+        return RETAILER_PARSERS[supplier]
+    except KeyError:
+        raise ValueError(f"No parser registered for supplier: {supplier}") from None
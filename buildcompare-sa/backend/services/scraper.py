@@ -1,9 +1,7 @@
 import asyncio
 import time
 import random
-from typing import List, Dict, Any, Optional
-import httpx
-from bs4 import BeautifulSoup
+from typing import Iterable, List, Dict, Any, Optional, Union
 
 from backend.models import PriceItem
 
@@ -14,13 +12,16 @@ class ScraperService:
     Uses AsyncIO for high-concurrency, non-blocking requests.
     """
     
-    def __init__(self) -> None:
+    def __init__(self, rng: Optional[random.Random] = None, latency_scale: float = 1.0) -> None:
         self.headers: Dict[str, str] = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
         self.cache: Dict[str, tuple[float, List[PriceItem]]] = {}
         self.cache_ttl: int = 300  # 5 minutes
         self.timeout: float = 5.0  # Aggressive timeout per backend_dev.md
+        # Seedable source for the mocked retailer data so benchmarks are reproducible
+        self.rng: random.Random = rng or random.Random()
+        self.latency_scale: float = latency_scale  # 0 disables simulated network delay
 
     async def get_prices(self, query: str) -> List[PriceItem]:
         """
@@ -38,12 +39,25 @@ class ScraperService:
 
         # Concurrent requests to all retailers
         results = await self._fetch_all_retailers(query)
+
+        # Record fresh prices for drop detection (imported here: NumPy loads on first scrape)
+        from backend.services.price_history import price_history
+        price_history.ingest(results)
         
         # Store in cache
         self.cache[query] = (current_time, results)
         
         return results
     
+    def parse_listing(self, supplier: str, html: Union[bytes, str, Iterable[bytes]]) -> List[PriceItem]:
+        """
+        Parse a fetched retailer search/category page into PriceItems.
+        Accepts the whole body or a chunk iterator (e.g. httpx ``iter_bytes()``).
+        """
+        # Imported here so lxml only loads once something is actually parsed
+        from backend.services.retailer_parsers import get_parser
+        return get_parser(supplier).parse(html)
+
     async def _fetch_all_retailers(self, query: str) -> List[PriceItem]:
         """
         Fetch from all retailers concurrently using asyncio.gather.
@@ -70,18 +84,18 @@ class ScraperService:
     async def _fetch_builders(self, query: str) -> List[PriceItem]:
         """
         Builders Warehouse scraper.
-        Note: Real implementation would use Playwright for JS-rendered content.
-        Currently mocked for prototype stability.
+        Note: Real implementation would use Playwright for JS-rendered content
+        and hand the rendered page to parse_listing(). Currently mocked for prototype stability.
         """
-        await asyncio.sleep(random.uniform(0.5, 1.5))  # Simulate network delay
+        await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.latency_scale)  # Simulate network delay
         
         return [
             PriceItem(
                 supplier="Builders Warehouse",
                 product=f"{query.capitalize()} - Standard Grade",
-                price=round(random.uniform(80, 450), 2),
+                price=round(self.rng.uniform(80, 450), 2),
                 in_stock=True,
-                stock_quantity=random.randint(50, 500),
+                stock_quantity=self.rng.randint(50, 500),
                 link="https://www.builders.co.za"
             )
         ]
@@ -89,17 +103,17 @@ class ScraperService:
     async def _fetch_cashbuild(self, query: str) -> List[PriceItem]:
         """
         Cashbuild scraper.
-        Method: HTML parsing (BeautifulSoup).
+        Method: HTML parsing (see CashbuildParser).
         """
-        await asyncio.sleep(random.uniform(0.3, 1.0))
+        await asyncio.sleep(self.rng.uniform(0.3, 1.0) * self.latency_scale)
         
         return [
             PriceItem(
                 supplier="Cashbuild",
                 product=f"{query.capitalize()} - Value Pack",
-                price=round(random.uniform(70, 420), 2),
+                price=round(self.rng.uniform(70, 420), 2),
                 in_stock=True,
-                stock_quantity=random.randint(30, 300),
+                stock_quantity=self.rng.randint(30, 300),
                 link="https://www.cashbuild.co.za"
             )
         ]
@@ -107,17 +121,17 @@ class ScraperService:
     async def _fetch_leroy_merlin(self, query: str) -> List[PriceItem]:
         """
         Leroy Merlin scraper.
-        Method: JSON-LD extraction or API inspection.
+        Method: JSON-LD extraction (see LeroyMerlinParser).
         """
-        await asyncio.sleep(random.uniform(0.4, 1.2))
+        await asyncio.sleep(self.rng.uniform(0.4, 1.2) * self.latency_scale)
         
         return [
             PriceItem(
                 supplier="Leroy Merlin",
                 product=f"{query.capitalize()} - Premium Quality",
-                price=round(random.uniform(90, 500), 2),
-                in_stock=random.choice([True, False]),
-                stock_quantity=random.randint(10, 200) if random.random() > 0.3 else 0,
+                price=round(self.rng.uniform(90, 500), 2),
+                in_stock=self.rng.choice([True, False]),
+                stock_quantity=self.rng.randint(10, 200) if self.rng.random() > 0.3 else 0,
                 link="https://leroymerlin.co.za"
             )
         ]
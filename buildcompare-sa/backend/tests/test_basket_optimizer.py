@@ -0,0 +1,136 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.basket import make_basket
+from backend.benchmarks.stubs import stubbed_services
+from backend.models import BasketLine, BasketOptimizeRequest, PriceItem, SupplierTerms
+from backend.services.basket_optimizer import BasketOptimizer
+
+optimizer = BasketOptimizer()
+
+
+def _offer(supplier: str, price: float, **kwargs) -> PriceItem:
+    return PriceItem(supplier=supplier, product=f"{supplier} item", price=price, **kwargs)
+
+
+def _check_feasible(request: BasketOptimizeRequest, response) -> None:
+    terms = {entry.supplier: entry for entry in request.suppliers}
+    bought = {}
+    for allocation in response.allocations:
+        bought[allocation.line] = bought.get(allocation.line, 0) + allocation.quantity
+    for i, line in enumerate(request.lines):
+        assert bought.get(i, 0) + response.unfulfilled.get(line.name, 0) == pytest.approx(line.quantity, abs=1e-4)
+    for order in response.orders:
+        if order.supplier in terms:
+            assert order.subtotal >= terms[order.supplier].min_order - 0.01
+
+
+@pytest.mark.parametrize("solver", ["exact", "heuristic"])
+def test_delivery_fee_favours_one_supplier(solver):
+    request = BasketOptimizeRequest(
+        lines=[
+            BasketLine(name="Cement", quantity=10, offers=[_offer("Cashbuild", 95), _offer("Builders Warehouse", 100)]),
+            BasketLine(name="Sand", quantity=2, offers=[_offer("Cashbuild", 400), _offer("Builders Warehouse", 390)]),
+        ],
+        suppliers=[SupplierTerms(supplier="Cashbuild", delivery_fee=300), SupplierTerms(supplier="Builders Warehouse", delivery_fee=300)],
+        solver=solver,
+    )
+    response = optimizer.optimize(request)
+    # Splitting saves R70 on goods but costs a second R300 delivery
+    assert [order.supplier for order in response.orders] == ["Cashbuild"]
+    assert response.total_cost == 950 + 800 + 300
+    assert response.solver == solver
+
+
+@pytest.mark.parametrize("solver", ["exact", "heuristic"])
+def test_stock_limits_split_a_line(solver):
+    request = BasketOptimizeRequest(
+        lines=[BasketLine(name="Bricks", quantity=1000, offers=[
+            _offer("Cashbuild", 2.0, stock_quantity=600),
+            _offer("Builders Warehouse", 2.5),
+            _offer("Leroy Merlin", 1.0, in_stock=False),
+        ])],
+        solver=solver,
+    )
+    response = optimizer.optimize(request)
+    assert {a.supplier: a.quantity for a in response.allocations} == {"Cashbuild": 600, "Builders Warehouse": 400}
+    assert response.total_cost == 2200
+
+
+def test_unfulfilled_quantity_is_reported():
+    request = BasketOptimizeRequest(lines=[
+        BasketLine(name="Roof Tiles", quantity=500, offers=[_offer("Cashbuild", 9.0, stock_quantity=300)]),
+        BasketLine(name="Timber", quantity=5, offers=[_offer("Cashbuild", 80.0, in_stock=False)]),
+    ])
+    response = optimizer.optimize(request)
+    assert response.unfulfilled == {"Roof Tiles": 200, "Timber": 5}
+    assert response.total_cost == 2700
+
+
+@pytest.mark.parametrize("solver", ["exact", "heuristic"])
+def test_minimum_order_is_respected(solver):
+    request = BasketOptimizeRequest(
+        lines=[
+            BasketLine(name="Paint", quantity=4, offers=[_offer("Leroy Merlin", 100), _offer("Cashbuild", 120)]),
+            BasketLine(name="Brushes", quantity=4, offers=[_offer("Leroy Merlin", 30), _offer("Cashbuild", 25)]),
+        ],
+        suppliers=[SupplierTerms(supplier="Leroy Merlin", min_order=450)],
+        solver=solver,
+    )
+    response = optimizer.optimize(request)
+    _check_feasible(request, response)
+    # Paint at Leroy Merlin (R400) is R50 short, so two whole brushes move there at R5 extra each
+    assert response.total_cost == pytest.approx(400 + 4 * 25 + 2 * 5, abs=0.01)
+
+
+@pytest.mark.parametrize("solver", ["exact", "heuristic"])
+def test_minimum_order_buys_whole_units(solver):
+    request = BasketOptimizeRequest(
+        lines=[
+            BasketLine(name="Cement", quantity=100, unit="bags", offers=[_offer("A", 100), _offer("B", 101)]),
+            BasketLine(name="Bricks", quantity=10, offers=[_offer("A", 60), _offer("B", 50)]),
+            BasketLine(name="Sand", quantity=2.5, unit="m3", offers=[_offer("A", 400)]),
+        ],
+        suppliers=[SupplierTerms(supplier="B", min_order=1000)],
+        solver=solver,
+    )
+    response = optimizer.optimize(request)
+    _check_feasible(request, response)
+    quantities = {(allocation.name, allocation.supplier): allocation.quantity for allocation in response.allocations}
+    # B's R500 of bricks is R500 short: 5 whole bags of cement (not 4.95) move there
+    assert quantities == {("Cement", "A"): 95, ("Cement", "B"): 5, ("Bricks", "B"): 10, ("Sand", "A"): 2.5}
+    assert response.total_cost == pytest.approx(95 * 100 + 5 * 101 + 500 + 1000, abs=0.01)
+
+
+@pytest.mark.parametrize("lines", [30, 300])
+def test_heuristic_is_feasible_and_close_to_exact(lines):
+    basket, terms = make_basket(lines, suppliers=6, seed=lines)
+    exact = optimizer.optimize(BasketOptimizeRequest(lines=basket, suppliers=terms, solver="exact", time_budget_ms=5000))
+    heuristic = optimizer.optimize(BasketOptimizeRequest(lines=basket, suppliers=terms, solver="heuristic", time_budget_ms=5000))
+
+    assert exact.optimal
+    request = BasketOptimizeRequest(lines=basket, suppliers=terms)
+    _check_feasible(request, exact)
+    _check_feasible(request, heuristic)
+    assert exact.total_cost <= heuristic.total_cost + 0.01
+    assert heuristic.total_cost <= exact.total_cost * 1.05
+
+
+def test_auto_switches_to_heuristic_for_large_baskets():
+    basket, terms = make_basket(20, suppliers=3, seed=2)
+    response = BasketOptimizer(exact_max_lines=10).optimize(BasketOptimizeRequest(lines=basket, suppliers=terms))
+    assert response.solver == "heuristic"
+    assert not response.optimal
+
+
+def test_optimize_endpoint():
+    with stubbed_services() as stubs:
+        client = TestClient(stubs["app"])
+        line = {"name": "Cement", "quantity": 3, "offers": [{"supplier": "Cashbuild", "product": "PPC", "price": 95}]}
+
+        response = client.post("/api/v1/estimator/optimize", json={"lines": [line]})
+        assert response.status_code == 200
+        assert response.json()["total_cost"] == 285
+
+        unreachable = {"lines": [line], "suppliers": [{"supplier": "Cashbuild", "min_order": 1000}]}
+        assert client.post("/api/v1/estimator/optimize", json=unreachable).status_code == 422
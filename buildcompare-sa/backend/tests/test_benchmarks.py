@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from backend.benchmarks import load, micro
+from backend.benchmarks.harness import build_report, compare_reports, percentile
+from backend.benchmarks.run import main
+from backend.benchmarks.stubs import stubbed_services
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+
+
+def test_stubbed_scraper_is_deterministic():
+    from backend.services.scraper import scraper_service
+
+    runs = []
+    for _ in range(2):
+        with stubbed_services(seed=7):
+            prices = asyncio.run(scraper_service.get_prices("cement"))
+            runs.append([(p.supplier, p.price, p.stock_quantity) for p in prices])
+    assert runs[0] == runs[1]
+    assert len(runs[0]) == 3
+
+
+def test_load_scenario_reports_percentiles():
+    result = load.run(total_requests=40, concurrency=4, seed=3)
+    overall = result["overall"]
+    assert overall["iterations"] == 40
+    assert overall["errors"] == 0
+    assert overall["p50_ms"] <= overall["p95_ms"] <= overall["p99_ms"]
+    assert set(result["endpoints"]) <= set(load.DEFAULT_MIX)
+
+
+def test_micro_suites_run():
+    results = micro.run(iterations=5)
+    assert set(results) == set(micro.SUITES)
+    assert results["calculations"]["bricks"]["iterations"] == 5
+
+
+def test_compare_flags_regressions():
+    baseline = build_report({"load": {"overall": {"p95_ms": 10.0, "throughput_rps": 100.0}}}, {})
+    current = build_report({"load": {"overall": {"p95_ms": 15.0, "throughput_rps": 99.0}}}, {})
+    regressions = compare_reports(baseline, current, tolerance=0.10)
+    assert [metric for metric, *_ in regressions] == ["load.overall.p95_ms"]
+
+
+def test_runner_writes_json(tmp_path):
+    output = tmp_path / "report.json"
+    assert main(["load", "--requests", "20", "--concurrency", "2", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert "load" in report["results"]
+    assert report["config"]["requests"] == 20
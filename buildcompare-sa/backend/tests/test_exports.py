@@ -0,0 +1,129 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.stubs import stubbed_services
+from backend.models import PriceItem, ProjectMaterialIn
+from backend.services import price_history as price_history_module
+from backend.services.exports import stream_csv, stream_xlsx
+from backend.services.price_history import PriceHistory
+from backend.services.project_store import ProjectNotFound, SQLiteProjectStore, get_project_store
+
+USER = "00000000-0000-4000-8000-000000000001"
+HEADER = ("Material", "Quantity", "Unit Price (ZAR)")
+
+
+def _rows(count: int):
+    return ((f"Brick <{i}> & mortar", i, round(i * 1.5, 2)) for i in range(count))
+
+
+def _sheet_rows(data: bytes):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert "[Content_Types].xml" in archive.namelist()
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+    return re.findall(r"<row r=\"\d+\">(.*?)</row>", sheet)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteProjectStore(str(tmp_path / "projects.sqlite3"))
+
+
+def test_csv_streams_in_chunks_and_round_trips():
+    chunks = list(stream_csv(HEADER, _rows(2500), flush_rows=1000))
+    assert len(chunks) == 3
+    text = b"".join(chunks).decode("utf-8-sig")
+    parsed = list(csv.reader(io.StringIO(text)))
+    assert parsed[0] == list(HEADER)
+    assert len(parsed) == 2501
+    assert parsed[11] == ["Brick <10> & mortar", "10", "15.0"]
+
+
+def test_csv_neutralises_formulas():
+    rows = [("=1+2", "+27 11", "-SUM(A1)", "@cmd", "\tTab", "\rReturn", "Plain = text", -5, 2.5)]
+    text = b"".join(stream_csv(("a", "b", "c", "d", "e", "f", "g", "h", "i"), rows)).decode("utf-8-sig")
+    parsed = list(csv.reader(io.StringIO(text)))
+    assert parsed[1] == ["'=1+2", "'+27 11", "'-SUM(A1)", "'@cmd", "'\tTab", "'\rReturn", "Plain = text", "-5", "2.5"]
+
+
+def test_xlsx_is_a_valid_workbook():
+    chunks = list(stream_xlsx(HEADER, _rows(20000)))
+    # Deflate output reaches the client as it is produced, not only when the sheet closes
+    assert len(chunks) > 5
+    assert max(len(chunk) for chunk in chunks) < len(b"".join(chunks)) / 4
+    rows = _sheet_rows(b"".join(chunks))
+    assert len(rows) == 20001
+    assert "Brick &lt;10&gt; &amp; mortar" in rows[11]
+    assert "<v>15.0</v>" in rows[11]
+
+
+def test_xlsx_cell_types():
+    rows = _sheet_rows(b"".join(stream_xlsx(("a", "b", "c", "d"), [("bad\x01text", None, True, datetime(2025, 3, 3))])))
+    assert rows[1] == (
+        '<c t="inlineStr"><is><t xml:space="preserve">badtext</t></is></c><c/>'
+        '<c t="b"><v>1</v></c><c t="inlineStr"><is><t xml:space="preserve">2025-03-03 00:00:00</t></is></c>'
+    )
+
+
+def test_iter_materials_batches_and_checks_owner(store):
+    project_id = store.create_project(USER, "House")
+    store.save_boq(project_id, USER, [ProjectMaterialIn(name=f"Material {i}", quantity=3, estimated_price=2.5) for i in range(25)])
+    store.save_boq(project_id, USER, [ProjectMaterialIn(name="Sand", quantity=1)])
+
+    rows = list(store.iter_materials(project_id, USER, batch_size=4))
+    assert len(rows) == 26
+    assert rows[0] == ("Material 0", None, None, 3, "units", 2.5, 7.5)
+    assert rows[-1] == ("Sand", None, None, 1, "units", None, None)
+
+    with pytest.raises(ProjectNotFound):
+        store.iter_materials(project_id, "someone-else")
+
+
+def test_export_endpoints(store, monkeypatch):
+    history = PriceHistory()
+    start = datetime(2025, 3, 3)
+    history.ingest([PriceItem(supplier="Cashbuild", product="Cement", price=90.0 + day, scraped_at=start + timedelta(days=day)) for day in range(3)])
+    history.ingest([PriceItem(supplier="Builders", product="Cement", price=99.0, scraped_at=start)])
+    monkeypatch.setattr(price_history_module, "price_history", history)
+
+    with stubbed_services() as stubs:
+        app = stubs["app"]
+        app.dependency_overrides[get_project_store] = lambda: store  # Cleared when the stubs exit
+        client = TestClient(app)
+        auth = {"Authorization": "Bearer user-1"}
+        project_id = store.create_project(USER, "House")
+        store.save_boq(project_id, USER, [ProjectMaterialIn(name="PPC Cement", quantity=10, unit="bags", estimated_price=95.5)])
+
+        response = client.get(f"/api/v1/projects/{project_id}/materials/export", headers=auth)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert f'filename="project-{project_id}-boq.csv"' in response.headers["content-disposition"]
+        assert response.content.decode("utf-8-sig").splitlines()[1] == "PPC Cement,,,10,bags,95.5,955.0"
+
+        xlsx = client.get(f"/api/v1/projects/{project_id}/materials/export", params={"format": "xlsx"}, headers=auth)
+        assert len(_sheet_rows(xlsx.content)) == 2
+        assert client.get(f"/api/v1/projects/{project_id}/materials/export", headers={"Authorization": "Bearer user-2"}).status_code == 404
+        assert client.get(f"/api/v1/projects/{project_id}/materials/export", params={"format": "pdf"}, headers=auth).status_code == 422
+
+        prices = client.get("/api/v1/prices/history/export", params={"supplier": "Cashbuild"})
+        lines = prices.content.decode("utf-8-sig").splitlines()
+        assert lines[1:] == [
+            f"Cashbuild,Cement,2025-03-0{3 + day} 00:00:00,{90.0 + day},{90.0 + day},{90.0 + day},1" for day in range(3)
+        ]
+        assert len(client.get("/api/v1/prices/history/export").content.decode("utf-8-sig").splitlines()) == 5
+
+        offers = [
+            {"supplier": "Cashbuild", "product": "Cement", "price": 95.0},
+            {"supplier": "Builders", "product": "Cement", "price": 90.0, "in_stock": False},
+        ]
+        comparison = client.post("/api/v1/estimator/export", json={"lines": [{"name": "Cement", "quantity": 2, "offers": offers}]})
+        rows = list(csv.reader(io.StringIO(comparison.content.decode("utf-8-sig"))))
+        assert [row[4] for row in rows[1:]] == ["Builders", "Cashbuild"]
+        assert [row[9] for row in rows[1:]] == ["False", "True"]
+        assert rows[2][7] == "190.0"
@@ -0,0 +1,153 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.stubs import stubbed_services
+from backend.models import PriceItem
+from backend.services.price_history import PriceHistory, group_stats
+
+START = datetime(2025, 3, 3, 0, 0, 0)
+
+
+def _item(price: float, at: datetime, product: str = "PPC Cement 42.5N") -> PriceItem:
+    return PriceItem(supplier="Cashbuild", product=product, price=price, scraped_at=at)
+
+
+def test_group_stats_exact_median():
+    keys = np.array([0, 0, 0, 1, 1, 0], dtype=np.int32)
+    buckets = np.array([0, 0, 0, 0, 0, 3600], dtype=np.int64)
+    prices = np.array([30.0, 10.0, 20.0, 5.0, 7.0, 99.0])
+    stats = group_stats(keys, buckets, prices)
+    assert stats[["key", "bucket"]].tolist() == [(0, 0), (0, 3600), (1, 0)]
+    assert stats["median"].tolist() == [20.0, 99.0, 6.0]
+    assert stats["min"].tolist() == [10.0, 99.0, 5.0]
+    assert stats["max"].tolist() == [30.0, 99.0, 7.0]
+    assert stats["count"].tolist() == [3, 1, 2]
+
+
+def test_drop_against_last_price():
+    history = PriceHistory(drop_threshold_pct=10)
+    assert history.ingest([_item(100.0, START)]) == []
+    assert history.ingest([_item(95.0, START + timedelta(minutes=5))]) == []
+
+    events = history.ingest([_item(80.0, START + timedelta(minutes=10))])
+    assert len(events) == 1
+    event = events[0]
+    assert event.previous_price == 95.0
+    assert event.basis == "last_price"
+    assert event.drop_pct == round((95 - 80) / 95 * 100, 2)
+    assert history.recent_events() == events
+
+
+def test_drop_against_rolling_median():
+    history = PriceHistory(drop_threshold_pct=10, median_window_days=7)
+    # A week of stable prices, then a slow slide that never drops 10% step to step
+    for day in range(7):
+        history.ingest([_item(100.0, START + timedelta(days=day, hours=hour)) for hour in (8, 12, 16)])
+    history.ingest([_item(94.0, START + timedelta(days=7, hours=8))])
+    events = history.ingest([_item(89.0, START + timedelta(days=7, hours=9))])
+    assert [event.basis for event in events] == ["rolling_median"]
+    assert events[0].rolling_median == 100.0
+
+
+def test_a_held_drop_alerts_once():
+    history = PriceHistory(drop_threshold_pct=10, median_window_days=7)
+    for day in range(7):
+        history.ingest([_item(100.0, START + timedelta(days=day, hours=hour)) for hour in (8, 12, 16)])
+
+    low = START + timedelta(days=7)
+    events = [event for hour in range(12) for event in history.ingest([_item(85.0, low + timedelta(hours=hour))])]
+    assert [(event.basis, event.drop_pct) for event in events] == [("both", 15.0)]
+
+    # A further drop below the alerted price fires again; so does a new drop after a recovery
+    assert len(history.ingest([_item(76.0, low + timedelta(hours=13))])) == 1
+    assert history.ingest([_item(76.0, low + timedelta(hours=14))]) == []
+    assert history.ingest([_item(100.0, low + timedelta(hours=15))]) == []
+    assert [event.basis for event in history.ingest([_item(85.0, low + timedelta(hours=16))])] == ["both"]
+    assert len(history.recent_events()) == 3
+
+
+def test_out_of_order_rows_do_not_trigger_drops():
+    history = PriceHistory(drop_threshold_pct=10)
+    history.ingest([_item(100.0, START + timedelta(hours=2))])
+    assert history.ingest([_item(50.0, START + timedelta(hours=1))]) == []
+
+
+def test_rollups_replace_raw_rows():
+    history = PriceHistory()
+    for day in range(3):
+        history.ingest([_item(100.0 + hour, START + timedelta(days=day, hours=hour)) for hour in range(24)])
+
+    stats = history.stats()
+    assert stats["hot_rows"] == 24  # Only the open day is kept raw
+    assert stats["daily_rollups"] == 2
+
+    daily = history.rollups("Cashbuild", "PPC Cement 42.5N", "daily")
+    assert [rollup.bucket_start for rollup in daily] == [START + timedelta(days=d) for d in range(3)]
+    assert daily[0].min_price == 100.0
+    assert daily[0].max_price == 123.0
+    assert daily[0].median_price == 111.5
+    assert daily[0].count == 24
+
+    hourly = history.rollups("Cashbuild", "PPC Cement 42.5N", "hourly", since=START + timedelta(days=2))
+    assert len(hourly) == 24
+    assert history.rollups("Cashbuild", "Unknown", "daily") == []
+
+
+def test_late_rows_for_closed_days_are_merged():
+    history = PriceHistory()
+    history.ingest([_item(100.0, START), _item(200.0, START + timedelta(days=2))])
+    history.ingest([_item(50.0, START + timedelta(hours=3))])
+
+    first_day = history.rollups("Cashbuild", "PPC Cement 42.5N", "daily")[0]
+    assert (first_day.min_price, first_day.max_price, first_day.count) == (50.0, 100.0, 2)
+
+
+def test_drops_since_accepts_timezone_aware_datetimes():
+    history = PriceHistory(drop_threshold_pct=10)
+    history.ingest([_item(100.0, START)])
+    history.ingest([_item(80.0, START + timedelta(hours=1))])
+
+    assert len(history.recent_events(since=datetime(2025, 3, 3, 0, 30, tzinfo=timezone.utc))) == 1
+    # 02:30 in UTC+2 is 00:30 UTC
+    assert len(history.recent_events(since=datetime(2025, 3, 3, 2, 30, tzinfo=timezone(timedelta(hours=2))))) == 1
+    assert history.recent_events(since=datetime(2025, 3, 3, 1, 30, tzinfo=timezone.utc)) == []
+
+
+def test_history_endpoints():
+    with stubbed_services(seed=11) as stubs:
+        client = TestClient(stubs["app"])
+        prices = client.get("/api/v1/prices/?query=rebar").json()
+        first = prices[0]
+
+        history = client.get(
+            "/api/v1/prices/history",
+            params={"supplier": first["supplier"], "product": first["product"], "granularity": "hourly"},
+        )
+        assert history.status_code == 200
+        assert history.json()[-1]["count"] >= 1
+
+        assert client.get("/api/v1/prices/drops").status_code == 200
+        assert client.get("/api/v1/prices/drops", params={"since": "2020-01-01T00:00:00Z"}).status_code == 200
+        assert client.get("/api/v1/prices/history", params={"supplier": "x" * 3, "product": "y" * 3, "granularity": "weekly"}).status_code == 422
+
+
+def test_concurrent_ingests_register_distinct_keys():
+    history = PriceHistory()
+    barrier = threading.Barrier(8)
+
+    def scrape(worker: int) -> None:
+        barrier.wait()
+        for batch in range(20):
+            history.ingest([_item(50.0, START, product=f"Product {worker}-{batch}-{i}") for i in range(25)])
+
+    threads = [threading.Thread(target=scrape, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert history.stats()["keys"] == 8 * 20 * 25
+    assert sorted(history._keys.values()) == list(range(8 * 20 * 25))
@@ -0,0 +1,80 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.stubs import StubGroqClient, stubbed_services
+from backend.services.groq_rag import extractive_answer, groq_rag_service
+
+QUERY = "How many bricks per square metre for a double skin wall?"
+
+
+def test_fast_llm_answers_directly():
+    with stubbed_services():
+        result = groq_rag_service.query(QUERY, deadline_s=1.0)
+    assert result["answered_by"] == "llm"
+    assert result["fallback_reason"] is None
+    assert result["llm_response"].startswith("Stub answer for:")
+
+
+def test_slow_llm_falls_back_to_extractive_answer():
+    with stubbed_services(llm_latency_s=2.0):
+        started = time.perf_counter()
+        result = groq_rag_service.query(QUERY, deadline_s=0.2)
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert result["answered_by"] == "extractive"
+    assert result["fallback_reason"] == "timeout"
+    assert result["model_used"] == "extractive"
+    assert result["llm_response"].startswith("From our knowledge base:")
+    assert "brick" in result["llm_response"].lower()
+
+
+def test_hedged_retry_wins_when_first_call_stalls(monkeypatch):
+    with stubbed_services():
+        client = StubGroqClient(latency_s=lambda call: 1.5 if call == 1 else 0.01)
+        groq_rag_service.groq_client = client  # Restored when the stubs exit
+        monkeypatch.setattr(groq_rag_service, "default_hedge_after_s", 0.05)
+        result = groq_rag_service.query(QUERY, deadline_s=1.0)
+
+    assert result["answered_by"] == "llm_hedged"
+    assert client.calls == 2
+    assert result["latency_ms"] < 500
+
+
+def test_failed_call_is_retried_immediately():
+    with stubbed_services():
+        client = StubGroqClient(failures={1})
+        groq_rag_service.groq_client = client  # Restored when the stubs exit
+        result = groq_rag_service.query(QUERY, deadline_s=1.0)
+        assert result["answered_by"] == "llm_hedged"
+
+        client = StubGroqClient(failures={1, 2})
+        groq_rag_service.groq_client = client  # Restored when the stubs exit
+        result = groq_rag_service.query(QUERY, deadline_s=1.0)
+        assert (result["answered_by"], result["fallback_reason"]) == ("extractive", "error")
+
+
+def test_hedge_delay_tracks_latency_percentile(monkeypatch):
+    with stubbed_services():
+        monkeypatch.setattr(groq_rag_service, "default_hedge_after_s", 3.0)
+        assert groq_rag_service.hedge_delay() == 3.0
+        groq_rag_service._llm_latencies.extend(i / 100 for i in range(1, 101))
+        assert groq_rag_service.hedge_delay() == 0.95
+
+
+def test_extractive_answer_picks_matching_sentences():
+    context = [
+        "Cement should be stored off the ground. Use PPC 42.5N for structural concrete.",
+        "A double skin wall needs about 100 bricks per square metre.",
+    ]
+    answer = extractive_answer("bricks per square metre", context, max_sentences=1)
+    assert answer == "From our knowledge base:\n- A double skin wall needs about 100 bricks per square metre."
+    assert "no matching" in extractive_answer("anything", [])
+
+
+def test_rag_endpoint_reports_answer_path():
+    with stubbed_services(llm_latency_s=1.0) as stubs:
+        response = TestClient(stubs["app"]).post("/rag/query", json={"query": QUERY, "deadline_ms": 150})
+    assert response.status_code == 200
+    assert response.json()["answered_by"] == "extractive"
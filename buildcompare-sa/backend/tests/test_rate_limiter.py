@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.stubs import stubbed_services
+from backend.services import auth
+from backend.services.rate_limiter import MemoryBucketStore, rate_limiter
+
+LINE = {"name": "Cement", "quantity": 3, "offers": [{"supplier": "Cashbuild", "product": "PPC", "price": 95}]}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_memory_bucket_refills_over_time():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+    take = lambda: asyncio.run(store.take("user:a", "estimator", 4, capacity=10, refill_per_sec=1.0))
+
+    assert take().allowed
+    assert take().allowed
+    rejected = take()
+    assert not rejected.allowed
+    assert rejected.retry_after == 2.0  # 2 tokens left, 4 needed at 1 token/s
+
+    clock.now = 2.0
+    assert take().allowed
+    assert asyncio.run(store.usage("user:a")) == {"estimator": {"allowed": 3, "rejected": 1, "tokens": 12}}
+
+
+def test_buckets_are_per_user_and_reject_with_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "capacity", 4)
+    monkeypatch.setattr(rate_limiter, "refill_per_sec", 0.5)
+    with stubbed_services(rate_limits=True) as stubs:
+        client = TestClient(stubs["app"])
+        alice = {"Authorization": "Bearer user-1"}
+
+        statuses = [client.post("/api/v1/estimator/optimize", json={"lines": [LINE]}, headers=alice).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+
+        rejected = client.post("/api/v1/estimator/optimize", json={"lines": [LINE]}, headers=alice)
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "4"
+
+        # Another user and an anonymous caller have their own buckets
+        assert client.post("/api/v1/estimator/optimize", json={"lines": [LINE]}, headers={"Authorization": "Bearer user-2"}).status_code == 200
+        assert client.post("/api/v1/estimator/optimize", json={"lines": [LINE]}).status_code == 200
+
+        usage = client.get("/api/v1/usage/", headers=alice).json()
+        assert usage["identity"].startswith("user:")
+        assert usage["endpoints"]["optimize"] == {"allowed": 2, "rejected": 2, "tokens": 4}
+        assert client.get("/api/v1/usage/").json()["identity"] == "ip:testclient"
+
+
+def test_invalid_token_is_not_treated_as_anonymous():
+    with stubbed_services(rate_limits=True) as stubs:
+        client = TestClient(stubs["app"])
+        response = client.post("/api/v1/estimator/optimize", json={"lines": [LINE]}, headers={"Authorization": "Bearer expired"})
+        assert response.status_code == 401
+
+
+def test_verified_tokens_are_cached_briefly(monkeypatch):
+    clock = FakeClock()
+    requests = []
+
+    def supabase(request: httpx.Request) -> httpx.Response:
+        requests.append(request.headers["Authorization"])
+        if request.headers["Authorization"] == "Bearer revoked":
+            return httpx.Response(401, json={"msg": "invalid JWT"})
+        return httpx.Response(200, json={"id": "user-a"})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(auth.httpx, "AsyncClient", lambda: real_client(transport=httpx.MockTransport(supabase)))
+    monkeypatch.setattr(auth, "time", SimpleNamespace(time=clock))
+    monkeypatch.setattr(auth, "SUPABASE_URL", "https://project.supabase.co")
+    monkeypatch.setattr(auth, "SUPABASE_ANON_KEY", "anon")
+    monkeypatch.setattr(auth, "_token_cache", {})
+
+    def verify(token: str):
+        return asyncio.run(auth.verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+
+    clock.now = 1000.0
+    claims = base64.urlsafe_b64encode(json.dumps({"sub": "user-a", "exp": 1030}).encode()).decode().rstrip("=")
+    jwt = f"header.{claims}.signature"
+    assert verify(jwt) == verify(jwt) == {"id": "user-a"}
+    assert len(requests) == 1
+    clock.now = 1030.0  # The JWT's own expiry comes before the cache TTL
+    verify(jwt)
+    assert len(requests) == 2
+
+    verify("opaque")
+    clock.now += auth.TOKEN_CACHE_TTL - 1
+    verify("opaque")
+    assert len(requests) == 3
+    clock.now += 1
+    verify("opaque")
+    assert len(requests) == 4
+
+    for _ in range(2):  # Rejections are not cached
+        with pytest.raises(auth.HTTPException) as rejected:
+            verify("revoked")
+        assert rejected.value.status_code == 401
+    assert len(requests) == 6
+
+
+def test_saturated_worker_sheds_load(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "max_in_flight", 0)
+    monkeypatch.setattr(rate_limiter, "shed", 0)
+    with stubbed_services(rate_limits=True) as stubs:
+        client = TestClient(stubs["app"])
+        response = client.post("/api/v1/estimator/optimize", json={"lines": [LINE]})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert rate_limiter.shed == 1
+        # Cheap, unlimited routes are unaffected
+        assert client.get("/health").status_code == 200
+    assert rate_limiter.in_flight == 0
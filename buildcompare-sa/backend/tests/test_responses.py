@@ -0,0 +1,138 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.payloads import make_price_items
+from backend.benchmarks.stubs import stubbed_services
+from backend.middleware import CompressionMiddleware
+from backend.responses import content_etag, dump_models, etag_matches
+
+
+def test_dump_models_matches_pydantic_json():
+    items = make_price_items(5)
+    assert json.loads(dump_models(items)) == [json.loads(item.model_dump_json()) for item in items]
+
+
+def test_etag_matching():
+    etag = content_etag(b"[]")
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def _compression_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/large")
+    def large():
+        return {"rows": ["cement"] * 500}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"row,{i}\n" for i in range(1000)), media_type="text/csv")
+
+    @app.get("/binary")
+    def binary():
+        return PlainTextResponse("x" * 500, media_type="image/png")
+
+    return app
+
+
+def test_compression_thresholds_and_streaming():
+    client = TestClient(_compression_app())
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["vary"]
+    assert large.json() == {"rows": ["cement"] * 500}
+
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert streamed.text.splitlines()[-1] == "row,999"
+
+    assert "content-encoding" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_brotli_preferred_when_available():
+    from backend import middleware
+
+    if middleware.brotli is None:
+        return
+    response = TestClient(_compression_app()).get("/large", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+
+
+def test_refused_encodings_are_not_used():
+    from backend import middleware
+
+    assert middleware.accepted_encodings(b"gzip;q=0, br; q=0.5, *;q=0.1") == {"gzip": 0.0, "br": 0.5, "*": 0.1}
+
+    client = TestClient(_compression_app())
+    for accept in ("gzip;q=0", "br;q=0, gzip;q=0", "*;q=0", "identity", "bro, gzipx"):
+        assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": accept}).headers, accept
+    assert client.get("/large", headers={"Accept-Encoding": "br;q=0, gzip"}).headers["content-encoding"] == "gzip"
+    assert client.get("/large", headers={"Accept-Encoding": "br;q=0.2, gzip;q=0.8"}).headers["content-encoding"] == "gzip"
+    if middleware.brotli is not None:
+        assert client.get("/large", headers={"Accept-Encoding": "*"}).headers["content-encoding"] == "br"
+
+
+def test_prices_etag_round_trip():
+    with stubbed_services(seed=5) as stubs:
+        client = TestClient(stubs["app"])
+        first = client.get("/api/v1/prices/?query=cement")
+        assert first.status_code == 200
+        assert len(first.json()) == 3
+        etag = first.headers["etag"]
+
+        again = client.get("/api/v1/prices/?query=cement", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+
+
+def test_encoded_price_bodies_are_bounded(monkeypatch):
+    from backend.routers import prices
+    from backend.services.scraper import scraper_service
+
+    monkeypatch.setattr(prices, "PRICE_BODY_CACHE_MAX_ENTRIES", 3)
+    with stubbed_services(seed=5) as stubs:
+        client = TestClient(stubs["app"])
+        for query in ("cement", "bricks", "rebar", "timber", "paint"):
+            assert client.get("/api/v1/prices/", params={"query": query}).status_code == 200
+        assert list(prices._encoded) == ["rebar", "timber", "paint"]
+
+        # Once the scraper's entry expires, the encoded body goes with it
+        stored_at, results, body, etag = prices._encoded["paint"]
+        prices._encoded["paint"] = (stored_at - scraper_service.cache_ttl, results, body, etag)
+        assert prices._cached_body("paint", results) is None
+        assert "paint" not in prices._encoded
+
+
+def test_estimator_results_cached_by_specs():
+    with stubbed_services(seed=5) as stubs:
+        client = TestClient(stubs["app"])
+        specs = {"foundation": "Strip footings", "structure": "Double skin"}
+        first = client.post("/api/v1/estimator/boq", json=specs)
+        assert first.status_code == 200
+        assert first.json()["materials"]
+
+        # Whitespace/case differences hit the same cache entry without another LLM call
+        second = client.post("/api/v1/estimator/boq", json={"foundation": "strip  footings", "structure": "double skin"})
+        assert second.headers["etag"] == first.headers["etag"]
+        assert stubs["groq"].calls == 1
+
+        not_modified = client.post("/api/v1/estimator/boq", json=specs, headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
@@ -0,0 +1,79 @@
+from backend.benchmarks.parsing import FIXTURES, load_fixture
+from backend.services.retailer_parsers import RETAILER_PARSERS, get_parser, parse_price, parse_stock
+from backend.services.scraper import scraper_service
+
+
+def test_parse_price_formats():
+    assert parse_price("R 1 299,95") == 1299.95
+    assert parse_price("R1,299.95") == 1299.95
+    assert parse_price("R\xa089") == 89.0
+    assert parse_price("1,299") == 1299.0
+    assert parse_price("Call for price") is None
+    assert parse_price("R0.00") is None
+
+
+def test_parse_stock_labels():
+    assert parse_stock("In stock at 12 stores")
+    assert parse_stock(None)
+    assert not parse_stock("Out of stock")
+    assert not parse_stock("https://schema.org/OutOfStock")
+
+
+def test_every_retailer_has_a_fixture():
+    assert set(FIXTURES) == set(RETAILER_PARSERS)
+
+
+def test_builders_fixture():
+    items = get_parser("Builders Warehouse").parse(load_fixture("Builders Warehouse"))
+    assert len(items) == 48
+    first = items[0]
+    assert first.product == "PPC Surebuild Cement 42.5N 50kg"
+    assert first.price == 2128.66
+    assert first.stock_quantity == 315
+    assert first.link == "https://www.builders.co.za/product/400000"
+    assert all(item.stock_quantity == 0 for item in items if not item.in_stock)
+
+
+def test_cashbuild_fixture():
+    items = get_parser("Cashbuild").parse(load_fixture("Cashbuild"))
+    assert len(items) == 36
+    assert items[0].price == 413.38
+    assert not items[0].in_stock
+    assert items[0].link.startswith("https://www.cashbuild.co.za/")
+    assert sum(not item.in_stock for item in items) == 11
+
+
+def test_leroy_merlin_prefers_json_ld():
+    items = get_parser("Leroy Merlin").parse(load_fixture("Leroy Merlin"))
+    assert len(items) == 40
+    assert items[0].stock_quantity == 59
+    assert items[0].link == "https://leroymerlin.co.za/p/81000"
+    assert all(item.currency == "ZAR" for item in items)
+
+
+def test_streamed_chunks_match_whole_page():
+    for supplier in FIXTURES:
+        html = load_fixture(supplier)
+        whole = scraper_service.parse_listing(supplier, html)
+        streamed = scraper_service.parse_listing(supplier, (html[i:i + 1024] for i in range(0, len(html), 1024)))
+        strip = lambda items: [item.model_dump(exclude={"scraped_at"}) for item in items]
+        assert strip(whole) == strip(streamed)
+
+
+def test_tile_markup_fallback_without_json_ld():
+    html = b"""<html><body><div class="lm-results">
+    <article class="lm-card"><a href="/p/1"><h2>Tile Adhesive 20kg</h2></a><p class="lm-card__price">R 189.90</p></article>
+    </div></body></html>"""
+    items = get_parser("Leroy Merlin").parse(html)
+    assert [(item.product, item.price, item.link) for item in items] == [
+        ("Tile Adhesive 20kg", 189.9, "https://leroymerlin.co.za/p/1")
+    ]
+
+
+def test_unknown_supplier():
+    try:
+        get_parser("Unknown Hardware")
+    except ValueError as e:
+        assert "Unknown Hardware" in str(e)
+    else:
+        raise AssertionError("Expected ValueError")
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend.benchmarks import startup
+from backend import main as main_module
+from backend.benchmarks.stubs import stubbed_services
+from backend.main import app
+from backend.services.groq_rag import GroqRAGService
+from backend.services.ocr_service import OCRService
+
+
+def test_import_does_not_load_heavy_dependencies():
+    result = startup.run(runs=1)
+    assert result["heavy_modules_loaded"] == []
+    assert result["import_ms"] > 0
+
+
+def test_services_initialize_lazily():
+    rag = GroqRAGService()
+    ocr = OCRService()
+    assert not rag.is_ready
+    assert not ocr.is_ready
+
+    ocr.warm_up()
+    assert ocr.is_ready
+
+
+def _wait_for_ready(client: TestClient, timeout_s: float = 5.0):
+    deadline = time.perf_counter() + timeout_s
+    response = client.get("/ready")
+    while response.status_code != 200 and time.perf_counter() < deadline:
+        time.sleep(0.02)
+        response = client.get("/ready")
+    return response
+
+
+def test_ready_is_separate_from_health(monkeypatch):
+    with stubbed_services():
+        from backend.services.groq_rag import groq_rag_service
+
+        release = threading.Event()
+        groq_rag_service._initialized = False  # Restored when the stubs exit
+        monkeypatch.setattr(groq_rag_service, "_initialize", lambda: release.wait(5))
+        monkeypatch.setattr(main_module, "WARM_UP_SERVICES", True)
+
+        with TestClient(app) as client:  # Runs the lifespan, which starts warm-up
+            assert client.get("/health").json() == {"status": "healthy"}
+            warming = client.get("/ready")
+            assert warming.status_code == 503
+            assert warming.json() == {"status": "warming", "components": {"rag": "warming", "ocr": "ready"}}
+
+            release.set()
+            ready = _wait_for_ready(client)
+            assert ready.status_code == 200
+            assert ready.json() == {"status": "ready", "components": {"rag": "ready", "ocr": "ready"}}
+
+
+def test_ready_without_warm_up_reports_lazy_services(monkeypatch):
+    with stubbed_services():
+        from backend.services.groq_rag import groq_rag_service
+
+        calls = []
+        groq_rag_service._initialized = False  # Restored when the stubs exit
+        monkeypatch.setattr(groq_rag_service, "_initialize", lambda: calls.append("rag"))
+        monkeypatch.setattr(main_module, "WARM_UP_SERVICES", False)
+
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == 200
+            assert response.json() == {"status": "ready", "components": {"rag": "lazy", "ocr": "ready"}}
+        assert calls == []  # Nothing was loaded ahead of its first request
+
+
+def test_health_answers_while_warm_up_blocks_a_request(monkeypatch):
+    with stubbed_services() as stubs:
+        from backend.services.groq_rag import groq_rag_service
+
+        warming = threading.Event()
+
+        def slow_initialize():
+            warming.set()
+            time.sleep(1.5)
+
+        groq_rag_service._initialized = False  # Restored when the stubs exit
+        monkeypatch.setattr(groq_rag_service, "_initialize", slow_initialize)
+        warm_up = threading.Thread(target=groq_rag_service.warm_up)
+        warm_up.start()
+        warming.wait()
+
+        async def scenario():
+            async with httpx.AsyncClient(app=stubs["app"], base_url="http://test") as client:
+                started = time.perf_counter()
+                estimate = asyncio.create_task(client.post("/api/v1/estimator/boq", json={"foundation": "Raft slab during warm-up"}))
+                await asyncio.sleep(0.1)  # The estimate is now waiting for warm-up
+                health = await client.get("/health")
+                # A blocked event loop would hold both the sleep and /health until warm-up ends
+                health_s = time.perf_counter() - started
+                return health, health_s, await estimate
+
+        health, health_s, estimate = asyncio.run(scenario())
+        warm_up.join()
+
+    assert health.status_code == 200
+    assert health_s < 0.75
+    assert estimate.status_code == 200